@@ -10,36 +10,16 @@ from src.ui.theme import apply_theme
 from src.config import APP_CONFIG
 
 def initialize_nlp_models():
-    """Pre-download and initialize NLP models during startup"""
-    try:
-        print("🔄 Initializing NLP models...")
-        
-        # Import and initialize Stanza
-        import stanza
-        from src.services.nlp_service import NLPService
-        
-        # Download English model if not present
-        try:
-            # Check if model exists first
-            stanza.Pipeline('en', processors='tokenize,ner', download_method=None, verbose=False)
-            print("✅ Stanza models already available")
-        except:
-            print("📥 Downloading Stanza English model (this may take a few minutes)...")
-            stanza.download('en', verbose=False)
-            print("✅ Stanza model downloaded successfully")
-        
-        # Pre-initialize the NLP service
-        nlp_service = NLPService()
-        nlp_service._initialize_stanza()
-        print("✅ NLP models ready for offline use")
-        
-    except Exception as e:
-        print(f"⚠️ Warning: Could not initialize NLP models: {e}")
-        print("🔄 App will use regex-based fallback for entity detection")
+    """Start loading the NLP models in the background (downloading them on first run)"""
+    print("🔄 Initializing NLP models...")
+    
+    # Imported here so startup does not wait on the NLP service; Stanza itself loads in its thread
+    from src.services.nlp_service import NLPService
+    NLPService.start_background_initialization()
 
 def main():
     """Initialize and run the application"""
-    # Initialize NLP models before starting the web server
+    # Initialize NLP models in the background so the UI is available immediately
     initialize_nlp_models()
     
     # Apply global theme
@@ -3,13 +3,77 @@ Central application state management
 Handles all data persistence and state transitions
 """
 
-from typing import Dict, List, Optional, Any
+from typing import BinaryIO, Dict, List, Optional, Set, Tuple, Any
+import codecs
 import json
+import mmap
+import re
+import sys
+from collections import Counter
 from dataclasses import dataclass, field
+from itertools import chain
+from operator import attrgetter
 from pathlib import Path
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
-@dataclass
+
+# Precompiled patterns used when splitting transcripts into paragraphs
+# A block starts at a non-blank character and runs until the next blank line
+_PARAGRAPH_BLOCK = re.compile(r'\S[^\n]*(?:\n(?![ \t\r\f\v]*\n)[^\n]*)*')
+_BLANK_LINE = re.compile(r'\n[ \t\r\f\v]*\n')
+_SENT_SPLIT = re.compile(r'[.!?]+')
+_PERIOD_CAP_SPLIT = re.compile(r'\.(?=\s+[A-Z])')
+
+# Transcript files are streamed from disk in chunks of this many bytes
+_READ_CHUNK_SIZE = 64 * 1024
+# Characters carried over between chunks so a blank line split across them is still found
+_CHUNK_OVERLAP = 64
+
+# Category values used for paragraph classification
+SPEAKERS = ('client', 'therapist', 'unknown')
+SENTIMENTS = ('positive', 'negative', 'neutral', 'mixed')
+
+# Shared string instances so every paragraph references the same category objects
+_INTERNED_CATEGORIES = {value: sys.intern(value) for value in SPEAKERS + SENTIMENTS}
+
+
+# Slotted dataclasses drop the per-instance __dict__ (slots=True needs Python 3.10+)
+_DATACLASS_OPTIONS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+
+def _intern_category(value: str) -> str:
+    """Return the shared instance of a speaker/sentiment category string"""
+    return _INTERNED_CATEGORIES.get(value) or sys.intern(value)
+
+
+_get_speaker = attrgetter('speaker')
+_get_sentiment = attrgetter('sentiment')
+_get_codes = attrgetter('codes')
+_get_entities = attrgetter('entities')
+
+# Serialized fields for export_state (entities and codes are converted separately)
+_PARAGRAPH_KEYS = ('id', 'text', 'speaker', 'sentiment', 'speaker_confidence', 'sentiment_confidence')
+_ENTITY_KEYS = ('text', 'entity_type', 'start_pos', 'end_pos', 'anonymized', 'replacement',
+                'paragraph_id', 'auto_detected')
+_SCHEME_KEYS = ('id', 'title', 'keywords')
+_paragraph_fields = attrgetter(*_PARAGRAPH_KEYS)
+_entity_fields = attrgetter(*_ENTITY_KEYS)
+_scheme_fields = attrgetter(*_SCHEME_KEYS)
+
+
+def _encode_default(obj):
+    """orjson fallback for types it does not encode natively"""
+    if isinstance(obj, (set, frozenset)):
+        return sorted(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+@dataclass(**_DATACLASS_OPTIONS)
 class Entity:
     """Represents a detected entity in the text"""
     text: str
@@ -18,9 +82,11 @@ class Entity:
     end_pos: int
     anonymized: bool = False
     replacement: str = ""
+    paragraph_id: Optional[int] = None
+    auto_detected: bool = True
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class Paragraph:
     """Represents a paragraph in the transcript"""
     id: int
@@ -28,15 +94,52 @@ class Paragraph:
     speaker: str = "unknown"  # "client", "therapist", "unknown"
     sentiment: str = "neutral"  # "positive", "negative", "neutral", "mixed"
     entities: List[Entity] = field(default_factory=list)
-    codes: List[str] = field(default_factory=list)
+    codes: Set[str] = field(default_factory=set)
+    speaker_confidence: Optional[float] = None
+    sentiment_confidence: Optional[float] = None
+    
+    def __post_init__(self):
+        self.speaker = _intern_category(self.speaker)
+        self.sentiment = _intern_category(self.sentiment)
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class CodingScheme:
     """Represents a coding scheme entry"""
     id: str
     title: str
-    keywords: List[str] = field(default_factory=list)
+    # Stored as a tuple; assign a new sequence to change the keywords
+    keywords: Tuple[str, ...] = ()
+    # Keyword strings shown in the UI, rebuilt when keywords is reassigned (underscored, so orjson does not save them)
+    _shown_keywords: Optional[Tuple[str, ...]] = field(init=False, default=None, repr=False, compare=False)
+    _keyword_preview: str = field(init=False, default='', repr=False, compare=False)
+    _display_keywords: str = field(init=False, default='', repr=False, compare=False)
+    
+    def __post_init__(self):
+        self.keywords = tuple(self.keywords)
+    
+    def _refresh_keyword_strings(self):
+        """Rebuild the display strings if keywords changed since they were built"""
+        keywords = self.keywords
+        if keywords is self._shown_keywords:
+            return
+        if not isinstance(keywords, tuple):
+            keywords = self.keywords = tuple(keywords)
+        self._keyword_preview = ', '.join(keywords[:3])
+        self._display_keywords = self._keyword_preview + ('...' if len(keywords) > 3 else '')
+        self._shown_keywords = keywords
+    
+    @property
+    def keyword_preview(self) -> str:
+        """The first three keywords, comma separated"""
+        self._refresh_keyword_strings()
+        return self._keyword_preview
+    
+    @property
+    def display_keywords(self) -> str:
+        """The first three keywords, with '...' when there are more"""
+        self._refresh_keyword_strings()
+        return self._display_keywords
 
 
 class AppState:
@@ -51,9 +154,12 @@ class AppState:
         self.transcript_file_path: Optional[str] = None
         self.original_transcript: str = ""
         self.current_transcript: str = ""
-        self.paragraphs: List[Paragraph] = []
-        self.entities: List[Entity] = []
-        self.coding_schemes: List[CodingScheme] = []
+        self._paragraphs: List[Paragraph] = []
+        # Reverse index of paragraph codes: code -> ids of the paragraphs carrying it
+        self._paragraphs_by_code: Dict[str, Set[int]] = {}
+        # Entities live on their paragraphs; this only holds ones not tied to a paragraph
+        self._unplaced_entities: List[Entity] = []
+        self._coding_schemes: Dict[str, CodingScheme] = {}
         self.analysis_results: Dict[str, Any] = {}
         
     def load_transcript(self, content: str, file_path: str = None):
@@ -65,12 +171,67 @@ class AppState:
         # Split into paragraphs with better handling of different line break patterns
         self._split_into_paragraphs(content)
     
+    def load_transcript_from_stream(self, stream: BinaryIO, file_path: str = None):
+        """Load transcript content from a binary stream, detecting paragraphs chunk by chunk"""
+        content, blocks, separated = self._read_transcript_stream(stream)
+        
+        self.original_transcript = content
+        self.current_transcript = content
+        self.transcript_file_path = file_path
+        self._build_paragraphs(blocks, separated, '\n' in content)
+    
+    def _read_transcript_stream(self, stream: BinaryIO):
+        """Decode a UTF-8 stream in chunks, collecting completed paragraph blocks as they arrive
+        
+        Returns the full decoded text, the list of stripped paragraph blocks and whether
+        any blank-line separator was found.
+        """
+        decoder = codecs.getincrementaldecoder('utf-8')()
+        chunks: List[str] = []
+        pending: List[str] = []
+        blocks: List[str] = []
+        separated = False
+        tail = ''
+        
+        while True:
+            raw = stream.read(_READ_CHUNK_SIZE)
+            text = decoder.decode(raw, final=not raw)
+            if text:
+                chunks.append(text)
+                # Only the new text (plus a short overlap) is searched for a paragraph break
+                window = tail + text
+                cut = None
+                for match in _BLANK_LINE.finditer(window):
+                    if match.end() > len(tail):
+                        cut = match
+                if cut is None:
+                    pending.append(text)
+                else:
+                    separated = True
+                    split_at = cut.end() - len(tail)
+                    pending.append(text[:split_at])
+                    blocks.extend(m.group(0).strip() for m in _PARAGRAPH_BLOCK.finditer(''.join(pending)))
+                    pending = [text[split_at:]]
+                tail = window[-_CHUNK_OVERLAP:]
+            if not raw:
+                break
+        
+        blocks.extend(m.group(0).strip() for m in _PARAGRAPH_BLOCK.finditer(''.join(pending)))
+        return ''.join(chunks), blocks, separated
+    
     def save_transcript_changes(self, new_content: str):
         """Save changes made to the transcript"""
+        # Nothing to re-split if the text did not actually change
+        if new_content == self.current_transcript and self.paragraphs:
+            return
         self.current_transcript = new_content
         # Re-split into paragraphs
         self._split_into_paragraphs(new_content)
     
+    def rebuild_transcript(self):
+        """Rebuild the current transcript from the paragraph texts"""
+        self.current_transcript = '\n\n'.join(p.text for p in self.paragraphs)
+    
     def reload_transcript(self):
         """Reload transcript from original content"""
         self.current_transcript = self.original_transcript
@@ -78,139 +239,246 @@ class AppState:
     
     def _split_into_paragraphs(self, content: str):
         """Split content into paragraphs using multiple strategies"""
-        # Try different splitting strategies
-        paragraphs_text = []
-        
-        # Strategy 1: Split by double line breaks
-        if '\n\n' in content:
-            paragraphs_text = [p.strip() for p in content.split('\n\n') if p.strip()]
-        
-        # Strategy 2: If no double line breaks, split by single line breaks
-        elif '\n' in content:
-            paragraphs_text = [p.strip() for p in content.split('\n') if p.strip()]
+        # Strategy 1: Blocks separated by blank lines, found in a single pass
+        self._build_paragraphs(
+            [m.group(0).strip() for m in _PARAGRAPH_BLOCK.finditer(content)],
+            _BLANK_LINE.search(content) is not None,
+            '\n' in content
+        )
+    
+    def _build_paragraphs(self, paragraphs_text: List[str], separated: bool, line_broken: bool):
+        """Create paragraphs from blank-line separated blocks, applying the fallback strategies
         
-        # Strategy 3: If no line breaks, split by sentences (as fallback)
-        else:
-            import re
-            sentences = re.split(r'[.!?]+', content)
-            paragraphs_text = [s.strip() for s in sentences if s.strip()]
+        separated and line_broken tell whether the whole text had a blank line or any line
+        break; the line and sentence fallbacks only apply when it had no blank line.
+        """
+        if not separated and len(paragraphs_text) == 1:
+            # Strategy 2: If no blank lines, split by single line breaks
+            if line_broken:
+                paragraphs_text = [p.strip() for p in paragraphs_text[0].split('\n') if p.strip()]
+            # Strategy 3: If no line breaks, split by sentences (as fallback)
+            else:
+                sentences = _SENT_SPLIT.split(paragraphs_text[0])
+                paragraphs_text = [s.strip() for s in sentences if s.strip()]
         
         # If still only one paragraph and it's very long, try to split it further
         if len(paragraphs_text) == 1 and len(paragraphs_text[0]) > 500:
             # Try splitting by periods followed by capital letters
-            import re
-            sentences = re.split(r'\.(?=\s+[A-Z])', paragraphs_text[0])
+            sentences = _PERIOD_CAP_SPLIT.split(paragraphs_text[0])
             if len(sentences) > 1:
                 paragraphs_text = [s.strip() + '.' if not s.endswith('.') else s.strip() for s in sentences if s.strip()]
         
-        self.paragraphs = [
-            Paragraph(id=i, text=text) 
-            for i, text in enumerate(paragraphs_text)
-        ]
+        # Fill a preallocated list, setting the Paragraph defaults directly to skip the
+        # generated __init__/__post_init__ per paragraph (keep in sync with Paragraph)
+        paragraphs: List[Paragraph] = [None] * len(paragraphs_text)
+        new_paragraph = Paragraph.__new__
+        for i, text in enumerate(paragraphs_text):
+            paragraph = new_paragraph(Paragraph)
+            paragraph.id = i
+            paragraph.text = text
+            paragraph.speaker = 'unknown'
+            paragraph.sentiment = 'neutral'
+            paragraph.entities = []
+            paragraph.codes = set()
+            paragraph.speaker_confidence = None
+            paragraph.sentiment_confidence = None
+            paragraphs[i] = paragraph
+        # Fresh paragraphs carry no codes, so the code index starts out empty
+        self._paragraphs = paragraphs
+        self._paragraphs_by_code = {}
+    
+    @property
+    def paragraphs(self) -> List[Paragraph]:
+        """Transcript paragraphs, indexed by paragraph id"""
+        return self._paragraphs
+    
+    @paragraphs.setter
+    def paragraphs(self, paragraphs: List[Paragraph]):
+        self._paragraphs = paragraphs
+        self._paragraphs_by_code = {}
+        for paragraph in paragraphs:
+            for code in paragraph.codes:
+                self._paragraphs_by_code.setdefault(code, set()).add(paragraph.id)
     
     def update_paragraph_speaker(self, paragraph_id: int, speaker: str):
         """Update speaker assignment for a paragraph"""
         if 0 <= paragraph_id < len(self.paragraphs):
-            self.paragraphs[paragraph_id].speaker = speaker
+            self.paragraphs[paragraph_id].speaker = _intern_category(speaker)
     
     def update_paragraph_sentiment(self, paragraph_id: int, sentiment: str):
         """Update sentiment for a paragraph"""
         if 0 <= paragraph_id < len(self.paragraphs):
-            self.paragraphs[paragraph_id].sentiment = sentiment
+            self.paragraphs[paragraph_id].sentiment = _intern_category(sentiment)
     
     def add_paragraph_code(self, paragraph_id: int, code: str):
         """Add a code to a paragraph"""
         if 0 <= paragraph_id < len(self.paragraphs):
-            if code not in self.paragraphs[paragraph_id].codes:
-                self.paragraphs[paragraph_id].codes.append(code)
+            self.paragraphs[paragraph_id].codes.add(code)
+            self._paragraphs_by_code.setdefault(code, set()).add(paragraph_id)
     
     def remove_paragraph_code(self, paragraph_id: int, code: str):
         """Remove a code from a paragraph"""
         if 0 <= paragraph_id < len(self.paragraphs):
-            if code in self.paragraphs[paragraph_id].codes:
-                self.paragraphs[paragraph_id].codes.remove(code)
+            self.paragraphs[paragraph_id].codes.discard(code)
+            paragraph_ids = self._paragraphs_by_code.get(code)
+            if paragraph_ids is not None:
+                paragraph_ids.discard(paragraph_id)
+                if not paragraph_ids:
+                    del self._paragraphs_by_code[code]
+    
+    def paragraphs_for_code(self, code: str) -> List[Paragraph]:
+        """Get the paragraphs carrying a code, in transcript order"""
+        return [self.paragraphs[i] for i in sorted(self._paragraphs_by_code.get(code, ()))]
+    
+    def has_coded_paragraphs(self) -> bool:
+        """Check whether any paragraph carries a code"""
+        return bool(self._paragraphs_by_code)
+    
+    @property
+    def entities(self) -> List[Entity]:
+        """All entities, gathered from their owning paragraphs"""
+        return list(chain(chain.from_iterable(map(_get_entities, self.paragraphs)), self._unplaced_entities))
+    
+    def get_entity(self, index: int) -> Entity:
+        """Entity at a position of the entities list, found without building the list"""
+        if index >= 0:
+            for owner in chain(map(_get_entities, self.paragraphs), (self._unplaced_entities,)):
+                if index < len(owner):
+                    return owner[index]
+                index -= len(owner)
+        raise IndexError('entity index out of range')
+    
+    def add_entity(self, entity: Entity):
+        """Add an entity to the paragraph it belongs to"""
+        if entity.paragraph_id is not None and 0 <= entity.paragraph_id < len(self.paragraphs):
+            self.paragraphs[entity.paragraph_id].entities.append(entity)
+        else:
+            self._unplaced_entities.append(entity)
+    
+    def remove_entity(self, entity: Entity):
+        """Remove an entity from the paragraph it belongs to"""
+        for owner in chain(map(_get_entities, self.paragraphs), (self._unplaced_entities,)):
+            for i, candidate in enumerate(owner):
+                if candidate is entity:
+                    del owner[i]
+                    return
+    
+    def clear_entities(self):
+        """Remove all entities from every paragraph"""
+        for paragraph in self.paragraphs:
+            paragraph.entities = []
+        self._unplaced_entities = []
+    
+    @property
+    def coding_schemes(self) -> List[CodingScheme]:
+        """Coding schemes in insertion order (stored keyed by id)"""
+        return list(self._coding_schemes.values())
+    
+    @coding_schemes.setter
+    def coding_schemes(self, schemes: List[CodingScheme]):
+        self._coding_schemes = {scheme.id: scheme for scheme in schemes}
     
     def add_coding_scheme(self, scheme: CodingScheme):
         """Add a new coding scheme"""
-        self.coding_schemes.append(scheme)
+        self._coding_schemes[scheme.id] = scheme
+    
+    def add_coding_schemes(self, schemes: List[CodingScheme]):
+        """Add several coding schemes at once"""
+        self._coding_schemes.update((scheme.id, scheme) for scheme in schemes)
     
     def remove_coding_scheme(self, scheme_id: str):
         """Remove a coding scheme"""
-        self.coding_schemes = [s for s in self.coding_schemes if s.id != scheme_id]
+        self._coding_schemes.pop(scheme_id, None)
+    
+    def has_coding_scheme(self, scheme_id: str) -> bool:
+        """Check whether a coding scheme with this id exists"""
+        return scheme_id in self._coding_schemes
     
     def get_paragraphs_by_speaker(self, speaker: str) -> List[Paragraph]:
         """Get all paragraphs by a specific speaker"""
         return [p for p in self.paragraphs if p.speaker == speaker]
     
+    def get_speaker_distribution(self) -> Dict[str, int]:
+        """Get distribution of speakers across paragraphs"""
+        counts = Counter(map(_get_speaker, self.paragraphs))
+        return {speaker: counts[speaker] for speaker in SPEAKERS}
+    
     def get_sentiment_distribution(self) -> Dict[str, int]:
         """Get distribution of sentiments across paragraphs"""
-        distribution = {"positive": 0, "negative": 0, "neutral": 0, "mixed": 0}
-        for paragraph in self.paragraphs:
-            if paragraph.sentiment in distribution:
-                distribution[paragraph.sentiment] += 1
-        return distribution
+        counts = Counter(map(_get_sentiment, self.paragraphs))
+        return {sentiment: counts[sentiment] for sentiment in SENTIMENTS}
     
     def get_coding_distribution(self) -> Dict[str, int]:
         """Get distribution of codes across paragraphs"""
-        distribution = {}
-        for paragraph in self.paragraphs:
-            for code in paragraph.codes:
-                distribution[code] = distribution.get(code, 0) + 1
-        return distribution
+        return dict(Counter(chain.from_iterable(map(_get_codes, self.paragraphs))))
     
     def export_state(self) -> Dict[str, Any]:
         """Export current state to dictionary for serialization"""
+        return self._build_state(
+            [
+                dict(zip(_PARAGRAPH_KEYS, _paragraph_fields(p)), codes=sorted(p.codes), entities=[
+                    dict(zip(_ENTITY_KEYS, _entity_fields(e))) for e in p.entities
+                ]) for p in self.paragraphs
+            ],
+            [dict(zip(_SCHEME_KEYS, _scheme_fields(s))) for s in self._coding_schemes.values()]
+        )
+    
+    def _build_state(self, paragraphs: List[Any], coding_schemes: List[Any]) -> Dict[str, Any]:
+        """Assemble the top-level state mapping around already converted paragraphs and schemes"""
+        # An unedited transcript is written once and flagged instead of duplicated
+        original = self.original_transcript
+        if original is self.current_transcript or original == self.current_transcript:
+            transcript_state = {'original_equals_current': True}
+        else:
+            transcript_state = {'original_transcript': original}
+        
         return {
             'current_step': self.current_step,
             'transcript_file_path': self.transcript_file_path,
-            'original_transcript': self.original_transcript,
+            **transcript_state,
             'current_transcript': self.current_transcript,
-            'paragraphs': [
-                {
-                    'id': p.id,
-                    'text': p.text,
-                    'speaker': p.speaker,
-                    'sentiment': p.sentiment,
-                    'codes': p.codes,
-                    'entities': [
-                        {
-                            'text': e.text,
-                            'entity_type': e.entity_type,
-                            'start_pos': e.start_pos,
-                            'end_pos': e.end_pos,
-                            'anonymized': e.anonymized,
-                            'replacement': e.replacement
-                        } for e in p.entities
-                    ]
-                } for p in self.paragraphs
-            ],
-            'coding_schemes': [
-                {
-                    'id': s.id,
-                    'title': s.title,
-                    'keywords': s.keywords
-                } for s in self.coding_schemes
-            ],
+            'paragraphs': paragraphs,
+            'coding_schemes': coding_schemes,
             'analysis_results': self.analysis_results
         }
     
     def save_to_file(self, file_path: str):
         """Save state to JSON file"""
+        if ORJSON_AVAILABLE:
+            # orjson encodes the (slotted) dataclasses natively, so no intermediate dicts are built
+            state = self._build_state(self.paragraphs, list(self._coding_schemes.values()))
+            with open(file_path, 'wb') as f:
+                f.write(orjson.dumps(
+                    state,
+                    default=_encode_default,
+                    option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+                ))
+            return
+        
         with open(file_path, 'w', encoding='utf-8') as f:
             json.dump(self.export_state(), f, indent=2, ensure_ascii=False)
     
     def load_from_file(self, file_path: str):
         """Load state from JSON file"""
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        if ORJSON_AVAILABLE:
+            # Parse straight from the mapped file pages instead of an intermediate str
+            with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                with memoryview(mm) as view:
+                    data = orjson.loads(view)
+        else:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
         
         self.current_step = data.get('current_step', 0)
         self.transcript_file_path = data.get('transcript_file_path')
-        self.original_transcript = data.get('original_transcript', '')
         self.current_transcript = data.get('current_transcript', '')
+        if data.get('original_equals_current'):
+            self.original_transcript = self.current_transcript
+        else:
+            self.original_transcript = data.get('original_transcript', '')
         
         # Reconstruct paragraphs
-        self.paragraphs = []
+        paragraphs = []
         for p_data in data.get('paragraphs', []):
             entities = [
                 Entity(
@@ -219,7 +487,9 @@ class AppState:
                     start_pos=e['start_pos'],
                     end_pos=e['end_pos'],
                     anonymized=e.get('anonymized', False),
-                    replacement=e.get('replacement', '')
+                    replacement=e.get('replacement', ''),
+                    paragraph_id=p_data['id'],
+                    auto_detected=e.get('auto_detected', True)
                 ) for e in p_data.get('entities', [])
             ]
             
@@ -229,9 +499,12 @@ class AppState:
                 speaker=p_data.get('speaker', 'unknown'),
                 sentiment=p_data.get('sentiment', 'neutral'),
                 entities=entities,
-                codes=p_data.get('codes', [])
+                codes=set(p_data.get('codes', [])),
+                speaker_confidence=p_data.get('speaker_confidence'),
+                sentiment_confidence=p_data.get('sentiment_confidence')
             )
-            self.paragraphs.append(paragraph)
+            paragraphs.append(paragraph)
+        self.paragraphs = paragraphs
         
         # Reconstruct coding schemes
         self.coding_schemes = [
@@ -2,17 +2,21 @@
 Application configuration settings
 """
 from pathlib import Path
+from types import MappingProxyType
 
-APP_CONFIG = {
+_FAVICON_PATH = str(Path(__file__).parent / "assets" / "images" / "favicon.ico")
+
+# Settings are read-only at runtime
+APP_CONFIG = MappingProxyType({
     'title': 'Psymerique - Therapeutic Transcript Analysis',
     'port': 8080,
     'max_file_size': 20 * 1024 * 1024,  # 20MB in bytes
-    'allowed_extensions': ['.txt'],
-    'favicon': str(Path(__file__).parent / "assets" / "images" / "favicon.ico")
-}
+    'allowed_extensions': ('.txt',),
+    'favicon': _FAVICON_PATH
+})
 
 # Color palette from instructions
-COLORS = {
+COLORS = MappingProxyType({
     'primary': '#3674B5',
     'secondary': '#578FCA', 
     'accent': '#A1E3F9',
@@ -25,15 +29,15 @@ COLORS = {
     'negative': '#F44336',
     'neutral': '#9E9E9E',
     'mixed': '#FF9800'
-}
+})
 
 # Sentiment colors mapping
-SENTIMENT_COLORS = {
+SENTIMENT_COLORS = MappingProxyType({
     'positive': COLORS['positive'],
     'negative': COLORS['negative'],
     'neutral': COLORS['neutral'],
     'mixed': COLORS['mixed']
-}
+})
 
 # Step names for the stepper
 STEPS = [
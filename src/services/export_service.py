@@ -3,28 +3,191 @@ Export service for generating reports in various formats
 """
 
 import json
+import gzip
 import os
 import base64
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, List, Optional
-from collections import Counter
-import tempfile
+from typing import TYPE_CHECKING, Dict, Any, List, Optional
+from collections import Counter, OrderedDict
+import io
+from functools import lru_cache
+from heapq import nlargest
+from operator import itemgetter
+from importlib.util import find_spec
 
-from fpdf import FPDF
 from nicegui import ui
+from ..app_state import SPEAKERS
 from ..utils.text_processing import extract_meaningful_words
 
-# Matplotlib for PNG export without browser dependency (so we avoided kaleido)
-import matplotlib
-matplotlib.use('Agg')  # non-GUI backend 
-import matplotlib.pyplot as plt
+# fpdf, matplotlib and wordcloud are heavy to import, so they are loaded on first use
+if TYPE_CHECKING:
+    from fpdf import FPDF
+    from matplotlib.figure import Figure
 
 try:
-    from wordcloud import WordCloud
-    WORDCLOUD_AVAILABLE = True
+    import orjson
+    ORJSON_AVAILABLE = True
 except ImportError:
-    WORDCLOUD_AVAILABLE = False
+    ORJSON_AVAILABLE = False
+
+# Transcripts with at least this many paragraphs are written to JSON one paragraph at a time
+_STREAM_JSON_MIN_PARAGRAPHS = 1000
+
+
+def _write_streamed_report(f, report_data: Dict[str, Any]):
+    """Write report_data as 2-space indented JSON, serializing transcript paragraphs one record at a time
+    
+    The output is the same as dumping the whole report with OPT_INDENT_2.
+    """
+    option = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+    f.write(b'{')
+    for index, (key, value) in enumerate(report_data.items()):
+        if index:
+            f.write(b',')
+        f.write(b'\n  ' + orjson.dumps(key) + b': ')
+        if key != 'transcript_data':
+            f.write(orjson.dumps(value, option=option).replace(b'\n', b'\n  '))
+            continue
+        paragraphs = value['paragraphs']
+        f.write(b'{\n    "paragraphs": [')
+        position = -1
+        for position, record in enumerate(paragraphs):
+            if position:
+                f.write(b',')
+            f.write(b'\n      ' + orjson.dumps(record, option=option).replace(b'\n', b'\n      '))
+        f.write(b'\n    ]\n  }' if position >= 0 else b']\n  }')
+    f.write(b'\n}' if report_data else b'}')
+
+
+# Rendered chart PNGs kept per service: one export draws at most four charts, and the
+# images and PDF exports of the same transcript share them
+_CHART_CACHE_SIZE = 8
+
+
+# Newlines plus common Unicode punctuation mapped to ASCII for the PDF core fonts
+_SANITIZE_TABLE = str.maketrans({
+    '\r': ' ',
+    '\n': ' ',
+    '\u2013': '-',   # en dash
+    '\u2014': '-',   # em dash
+    '\u2026': '...', # ellipsis
+    '\u2018': "'",   # left single quote
+    '\u2019': "'",   # right single quote
+    '\u201C': '"',   # left double quote
+    '\u201D': '"',   # right double quote
+    '\u00A0': ' ',   # non-breaking space
+})
+
+
+# Sized to hold the static labels plus the truncated paragraph bodies of a report
+@lru_cache(maxsize=8192)
+def _sanitize_pdf_text(text: str) -> str:
+    """Translate text to latin-1 in one pass, dropping anything the core fonts cannot render"""
+    return text.translate(_SANITIZE_TABLE).encode('latin-1', 'ignore').decode('latin-1')
+
+
+# Fast zlib level for chart PNGs; the files are slightly larger but encode several times faster
+_PNG_SAVE_OPTIONS = {'compress_level': 1}
+
+# Agg figure reused by every chart rendered in this process (see _chart_axes)
+_CHART_FIGURE: Optional['Figure'] = None
+
+
+@lru_cache(maxsize=None)
+def _wordcloud_available() -> bool:
+    """Check once whether the optional wordcloud package is installed, without importing it"""
+    return find_spec('wordcloud') is not None
+
+
+def _use_agg_backend():
+    """Import matplotlib and select the non-GUI backend (PNG export without kaleido)"""
+    import matplotlib
+    matplotlib.use('Agg')
+
+
+def _chart_axes(figsize):
+    """Return the reusable figure, cleared and resized, with a fresh axes on it"""
+    global _CHART_FIGURE
+    if _CHART_FIGURE is None:
+        _use_agg_backend()
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        _CHART_FIGURE = Figure(dpi=150)
+        FigureCanvasAgg(_CHART_FIGURE)
+    _CHART_FIGURE.clear()
+    _CHART_FIGURE.set_size_inches(figsize)
+    return _CHART_FIGURE, _CHART_FIGURE.add_subplot(111)
+
+
+# Chart renderers share the reusable figure and return PNG bytes
+def _render_word_frequency(wf_data, width: float, fontsize: int) -> bytes:
+    """Render the top word frequency bar chart as PNG bytes"""
+    labels = [w for w, c in wf_data]
+    values = [c for w, c in wf_data]
+    fig, ax = _chart_axes((width, 6))
+    ax.barh(labels, values, color="#3674B5")
+    offset = max(values)*0.01 if values else 0.1
+    for i, v in enumerate(values):
+        ax.text(v + offset, i, str(v), va='center', fontsize=fontsize)
+    ax.set_xlabel('Frequency')
+    ax.set_ylabel('Words')
+    ax.set_title('Top Word Frequency')
+    fig.tight_layout()
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', pil_kwargs=_PNG_SAVE_OPTIONS)
+    return buffer.getvalue()
+
+
+def _render_wordcloud(frequencies: Dict[str, int]) -> bytes:
+    """Render the word cloud of the most frequent meaningful words as PNG bytes"""
+    _use_agg_backend()
+    from wordcloud import WordCloud
+    wordcloud = WordCloud(
+        width=800, 
+        height=400,
+        background_color='white',
+        colormap='viridis',
+        max_words=100,
+        relative_scaling=0.5,
+        random_state=42
+    ).generate_from_frequencies(frequencies)
+    # to_file() saves with optimize=True, which is far slower than the chart PNGs
+    buffer = io.BytesIO()
+    wordcloud.to_image().save(buffer, format='PNG', **_PNG_SAVE_OPTIONS)
+    return buffer.getvalue()
+
+
+def _render_sentiment_distribution(sd_data: Dict[str, int], figsize) -> bytes:
+    """Render the sentiment distribution pie chart as PNG bytes"""
+    labels = [k.title() for k, v in sd_data.items() if v > 0]
+    sizes = [v for v in sd_data.values() if v > 0]
+    colors = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#FFA726']
+    fig, ax = _chart_axes(figsize)
+    ax.pie(sizes, labels=labels, autopct='%1.1f%%', startangle=140, colors=colors[:len(sizes)])
+    ax.set_title('Sentiment Distribution')
+    fig.tight_layout()
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', pil_kwargs=_PNG_SAVE_OPTIONS)
+    return buffer.getvalue()
+
+
+def _render_encoding_overview(enc_data: Dict[str, int], width: float, fontsize: int) -> bytes:
+    """Render the coding distribution bar chart as PNG bytes"""
+    labels = list(enc_data.keys())
+    values = list(enc_data.values())
+    fig, ax = _chart_axes((width, max(6, 0.4*len(labels))))
+    ax.barh(labels, values, color="#A1E3F9")
+    offset = max(values)*0.01 if values else 0.1
+    for i, v in enumerate(values):
+        ax.text(v + offset, i, str(v), va='center', fontsize=fontsize)
+    ax.set_xlabel('Number of Paragraphs')
+    ax.set_ylabel('Coding Categories')
+    ax.set_title('Encoding Overview')
+    fig.tight_layout()
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', pil_kwargs=_PNG_SAVE_OPTIONS)
+    return buffer.getvalue()
 
 
 class ExportService:
@@ -33,9 +196,13 @@ class ExportService:
     def __init__(self, app_state):
         self.app_state = app_state
         self._pdf_font_family = 'Arial'
+        # (paragraph texts, word counts) of the last tokenization
+        self._wf_cache = None
+        # LRU of rendered chart PNGs keyed on (renderer, chart data, render options)
+        self._chart_cache: 'OrderedDict[tuple, bytes]' = OrderedDict()
         
-    def export_json(self, filename: Optional[str] = None) -> str:
-        """Export comprehensive analysis results as JSON"""
+    def export_json(self, filename: Optional[str] = None, compress: bool = False) -> str:
+        """Export comprehensive analysis results as JSON, gzip-compressed to a .gz file when compress is set"""
         try:
             # Generate filename if not provided
             if not filename:
@@ -43,9 +210,16 @@ class ExportService:
                 filename = f"Psymerique_analysis_{timestamp}.json"
             
             # Extract meaningful words for analysis
-            all_text = ' '.join([p.text for p in self.app_state.paragraphs])
-            words = extract_meaningful_words(all_text)
-            word_counts = Counter(words)
+            word_counts = self._compute_word_stats()
+            
+            # Speaker and coding counts in one sweep; paragraph records stay lazy for streaming
+            speaker_distribution = dict.fromkeys(SPEAKERS, 0)
+            coded_paragraphs = 0
+            for p in self.app_state.paragraphs:
+                if p.speaker in speaker_distribution:
+                    speaker_distribution[p.speaker] += 1
+                if p.codes:
+                    coded_paragraphs += 1
             
             # Create comprehensive report data
             report_data = {
@@ -56,7 +230,7 @@ class ExportService:
                 },
                 'summary': {
                     'total_paragraphs': len(self.app_state.paragraphs),
-                    'coded_paragraphs': len([p for p in self.app_state.paragraphs if p.codes]),
+                    'coded_paragraphs': coded_paragraphs,
                     'coding_schemes': len(self.app_state.coding_schemes),
                     'unique_words': len(word_counts),
                     'total_words': sum(word_counts.values())
@@ -65,24 +239,21 @@ class ExportService:
                     'word_frequency': dict(word_counts.most_common(100)),
                     'sentiment_distribution': self.app_state.get_sentiment_distribution(),
                     'coding_distribution': self.app_state.get_coding_distribution(),
-                    'speaker_distribution': {
-                        'client': len(self.app_state.get_paragraphs_by_speaker('client')),
-                        'therapist': len(self.app_state.get_paragraphs_by_speaker('therapist')),
-                        'unknown': len(self.app_state.get_paragraphs_by_speaker('unknown'))
-                    }
+                    'speaker_distribution': speaker_distribution
                 },
                 'transcript_data': {
-                    'paragraphs': [
+                    # Generated lazily so large transcripts can be streamed record by record
+                    'paragraphs': (
                         {
                             'id': p.id,
                             'text': p.text,
                             'speaker': p.speaker,
                             'sentiment': p.sentiment,
-                            'sentiment_confidence': getattr(p, 'sentiment_confidence', None),
-                            'codes': p.codes,
+                            'sentiment_confidence': p.sentiment_confidence,
+                            'codes': sorted(p.codes),
                             'order': idx
                         } for idx, p in enumerate(self.app_state.paragraphs)
-                    ]
+                    )
                 },
                 'configuration': {
                     'coding_schemes': [
@@ -102,8 +273,27 @@ class ExportService:
             
             # Save JSON file
             file_path = downloads_dir / filename
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(report_data, f, indent=2, ensure_ascii=False)
+            if compress:
+                file_path = file_path.with_name(file_path.name + '.gz')
+            
+            if ORJSON_AVAILABLE and len(self.app_state.paragraphs) >= _STREAM_JSON_MIN_PARAGRAPHS:
+                # Level 1 keeps compression cheaper than the disk writes it saves
+                with (gzip.open(file_path, 'wb', compresslevel=1) if compress else open(file_path, 'wb')) as f:
+                    _write_streamed_report(f, report_data)
+            else:
+                transcript_data = report_data['transcript_data']
+                transcript_data['paragraphs'] = list(transcript_data['paragraphs'])
+                if ORJSON_AVAILABLE:
+                    data = orjson.dumps(report_data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+                    if compress:
+                        with gzip.open(file_path, 'wb', compresslevel=1) as f:
+                            f.write(data)
+                    else:
+                        file_path.write_bytes(data)
+                else:
+                    with (gzip.open(file_path, 'wt', encoding='utf-8', compresslevel=1) if compress
+                          else open(file_path, 'w', encoding='utf-8')) as f:
+                        json.dump(report_data, f, indent=2, ensure_ascii=False)
             
             return str(file_path)
             
@@ -119,74 +309,39 @@ class ExportService:
             
             downloads_dir = Path.home() / "Downloads"
             downloads_dir.mkdir(exist_ok=True)
-            exported_files: List[str] = []
             
             # Prepare data once
             wf_data = self._get_word_frequency_data(top_n=15)
             sd_data = self.app_state.get_sentiment_distribution()
             enc_data = self.app_state.get_coding_distribution()
-            spk_data = {
-                'Client': len(self.app_state.get_paragraphs_by_speaker('client')),
-                'Therapist': len(self.app_state.get_paragraphs_by_speaker('therapist')),
-                'Unknown': len(self.app_state.get_paragraphs_by_speaker('unknown')),
-            }
-            spk_data = {k: v for k, v in spk_data.items() if v > 0}
+            spk_data = {k.title(): v for k, v in self.app_state.get_speaker_distribution().items() if v > 0}
+            
+            # Each job is (chart name, renderer, args)
+            jobs = []
             
             # 1) Word Frequency Chart
             if wf_data:
-                path = downloads_dir / f"{filename_prefix}_word_frequency.png"
-                labels = [w for w, c in wf_data]
-                values = [c for w, c in wf_data]
-                plt.figure(figsize=(10, 6), dpi=150)
-                plt.barh(labels, values, color="#3674B5")
-                for i, v in enumerate(values):
-                    plt.text(v + max(values)*0.01 if values else 0.1, i, str(v), va='center', fontsize=9)
-                plt.xlabel('Frequency')
-                plt.ylabel('Words')
-                plt.title('Top Word Frequency')
-                plt.tight_layout()
-                plt.savefig(path, bbox_inches='tight')
-                plt.close()
-                exported_files.append(str(path))
+                jobs.append(('word_frequency', _render_word_frequency, (wf_data, 10, 9)))
             
             # 2) Word Cloud
-            if WORDCLOUD_AVAILABLE:
-                wc_path = self._create_wordcloud_image(downloads_dir, filename_prefix)
-                if wc_path:
-                    exported_files.append(wc_path)
+            if _wordcloud_available():
+                frequencies = self._get_wordcloud_frequencies()
+                if frequencies:
+                    jobs.append(('wordcloud', _render_wordcloud, (frequencies,)))
             
             # 3) Sentiment Distribution
             if sum(sd_data.values()) > 0:
-                path = downloads_dir / f"{filename_prefix}_sentiment_distribution.png"
-                labels = [k.title() for k, v in sd_data.items() if v > 0]
-                sizes = [v for v in sd_data.values() if v > 0]
-                colors = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#FFA726']
-                plt.figure(figsize=(8, 8), dpi=150)
-                plt.pie(sizes, labels=labels, autopct='%1.1f%%', startangle=140, colors=colors[:len(sizes)])
-                plt.title('Sentiment Distribution')
-                plt.tight_layout()
-                plt.savefig(path, bbox_inches='tight')
-                plt.close()
-                exported_files.append(str(path))
+                jobs.append(('sentiment_distribution', _render_sentiment_distribution, (sd_data, (8, 8))))
             
             # 4) Encoding Overview
             if enc_data:
-                path = downloads_dir / f"{filename_prefix}_encoding_overview.png"
-                labels = list(enc_data.keys())
-                values = list(enc_data.values())
-                plt.figure(figsize=(10, max(6, 0.4*len(labels))), dpi=150)
-                plt.barh(labels, values, color="#A1E3F9")
-                for i, v in enumerate(values):
-                    plt.text(v + (max(values)*0.01 if values else 0.1), i, str(v), va='center', fontsize=9)
-                plt.xlabel('Number of Paragraphs')
-                plt.ylabel('Coding Categories')
-                plt.title('Encoding Overview')
-                plt.tight_layout()
-                plt.savefig(path, bbox_inches='tight')
-                plt.close()
-                exported_files.append(str(path))
-            
+                jobs.append(('encoding_overview', _render_encoding_overview, (enc_data, 10, 9)))
             
+            exported_files: List[str] = []
+            for (name, _, _), png in zip(jobs, self._render_charts(jobs)):
+                path = downloads_dir / f"{filename_prefix}_{name}.png"
+                path.write_bytes(png)
+                exported_files.append(str(path))
             return exported_files
         except Exception as e:
             raise Exception(f"Error exporting charts: {str(e)}")
@@ -201,6 +356,8 @@ class ExportService:
             downloads_dir.mkdir(exist_ok=True)
             file_path = downloads_dir / filename
             
+            from fpdf import FPDF
+            
             pdf = FPDF()
             pdf.set_auto_page_break(auto=True, margin=15)
             pdf.add_page()
@@ -208,90 +365,42 @@ class ExportService:
             self._add_executive_summary(pdf)
             self._add_analysis_results(pdf)
             
-            # Generate chart PNGs and embed them
-            tmp_dir = Path(tempfile.mkdtemp(prefix="Psymerique_pdf_"))
-            chart_files: List[Path] = []
+            # Generate chart PNGs in memory and embed them
+            jobs = []
             
             # Word Frequency Chart
             wf = self._get_word_frequency_data(top_n=15)
             if wf:
-                p = tmp_dir / "word_frequency.png"
-                labels = [w for w, c in wf]
-                values = [c for w, c in wf]
-                plt.figure(figsize=(8, 6), dpi=150)
-                plt.barh(labels, values, color="#3674B5")
-                for i, v in enumerate(values):
-                    plt.text(v + (max(values)*0.01 if values else 0.1), i, str(v), va='center', fontsize=8)
-                plt.xlabel('Frequency')
-                plt.ylabel('Words')
-                plt.title('Top Word Frequency')
-                plt.tight_layout()
-                plt.savefig(p, bbox_inches='tight')
-                plt.close()
-                chart_files.append(p)
+                jobs.append(('word_frequency', _render_word_frequency, (wf, 8, 8)))
             
             # Word Cloud
-            if WORDCLOUD_AVAILABLE:
-                all_text = ' '.join([p.text for p in self.app_state.paragraphs])
-                words = extract_meaningful_words(all_text)
-                word_text = ' '.join(words)
-                if word_text.strip():
-                    p = tmp_dir / "wordcloud.png"
-                    wordcloud = WordCloud(
-                        width=800, 
-                        height=400,
-                        background_color='white',
-                        colormap='viridis',
-                        max_words=100,
-                        relative_scaling=0.5,
-                        random_state=42
-                    ).generate(word_text)
-                    wordcloud.to_file(str(p))
-                    chart_files.append(p)
+            if _wordcloud_available():
+                frequencies = self._get_wordcloud_frequencies()
+                if frequencies:
+                    jobs.append(('wordcloud', _render_wordcloud, (frequencies,)))
             
             # Sentiment Distribution
             sd = self.app_state.get_sentiment_distribution()
             if sum(sd.values()) > 0:
-                p = tmp_dir / "sentiment_distribution.png"
-                labels = [k.title() for k, v in sd.items() if v > 0]
-                sizes = [v for v in sd.values() if v > 0]
-                colors = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#FFA726']
-                plt.figure(figsize=(8, 6), dpi=150)
-                plt.pie(sizes, labels=labels, autopct='%1.1f%%', startangle=140, colors=colors[:len(sizes)])
-                plt.title('Sentiment Distribution')
-                plt.tight_layout()
-                plt.savefig(p, bbox_inches='tight')
-                plt.close()
-                chart_files.append(p)
+                jobs.append(('sentiment_distribution', _render_sentiment_distribution, (sd, (8, 6))))
             
             # Encoding Overview
             enc = self.app_state.get_coding_distribution()
             if enc:
-                p = tmp_dir / "encoding_overview.png"
-                labels = list(enc.keys())
-                values = list(enc.values())
-                plt.figure(figsize=(8, max(6, 0.4*len(labels))), dpi=150)
-                plt.barh(labels, values, color="#A1E3F9")
-                for i, v in enumerate(values):
-                    plt.text(v + (max(values)*0.01 if values else 0.1), i, str(v), va='center', fontsize=8)
-                plt.xlabel('Number of Paragraphs')
-                plt.ylabel('Coding Categories')
-                plt.title('Encoding Overview')
-                plt.tight_layout()
-                plt.savefig(p, bbox_inches='tight')
-                plt.close()
-                chart_files.append(p)
+                jobs.append(('encoding_overview', _render_encoding_overview, (enc, 8, 8)))
+            
+            chart_images = self._render_charts(jobs)
             
             # Embed images in PDF - each chart on its own page
-            for img in chart_files:
+            for (name, _, _), png in zip(jobs, chart_images):
                 pdf.add_page()
                 pdf.set_font('Arial', 'B', 14)
-                pdf.cell(0, 8, img.stem.replace('_', ' ').title(), 0, 1, 'L')
+                pdf.cell(0, 8, name.replace('_', ' ').title(), 0, 1, 'L')
                 pdf.ln(5)
                 # Calculate image dimensions to fit page
                 page_w = pdf.w - 20
                 max_h = pdf.h - 60  # Leave space for title and margins
-                pdf.image(str(img), x=10, y=pdf.get_y(), w=page_w, h=min(max_h, page_w * 0.6))
+                pdf.image(io.BytesIO(png), x=10, y=pdf.get_y(), w=page_w, h=min(max_h, page_w * 0.6))
             
             # Add transcript sample on new page
             pdf.add_page()
@@ -302,43 +411,65 @@ class ExportService:
         except Exception as e:
             raise Exception(f"Error generating PDF: {str(e)}")
     
+    def _compute_word_stats(self):
+        """Tokenize the transcript once and reuse the result until a paragraph text changes"""
+        texts = tuple(p.text for p in self.app_state.paragraphs)
+        if self._wf_cache is not None and self._wf_cache[0] == texts:
+            return self._wf_cache[1]
+        
+        # Tokenize per paragraph so the whole transcript is never joined into one string
+        word_counts = Counter()
+        for text in texts:
+            word_counts.update(extract_meaningful_words(text))
+        self._wf_cache = (texts, word_counts)
+        return word_counts
+    
     def _get_word_frequency_data(self, top_n: int = 15):
         """Helper to compute top-N word frequency list [(word, count), ...]"""
         if not self.app_state.paragraphs:
             return []
-        all_text = ' '.join([p.text for p in self.app_state.paragraphs])
-        words = extract_meaningful_words(all_text)
-        word_counts = Counter(words)
+        word_counts = self._compute_word_stats()
         return word_counts.most_common(top_n)
     
-    def _create_wordcloud_image(self, downloads_dir: Path, filename_prefix: str) -> Optional[str]:
-        """Create and save word cloud image"""
+    def _get_wordcloud_frequencies(self) -> Dict[str, int]:
+        """Helper to build the word cloud input from the already counted meaningful words"""
         if not self.app_state.paragraphs:
-            return None
-        
-        all_text = ' '.join([p.text for p in self.app_state.paragraphs])
-        words = extract_meaningful_words(all_text)
-        word_text = ' '.join(words)
-        
-        if not word_text.strip():
-            return None
-        
-        wordcloud = WordCloud(
-            width=800, 
-            height=400,
-            background_color='white',
-            colormap='viridis',
-            max_words=100,
-            relative_scaling=0.5,
-            random_state=42
-        ).generate(word_text)
+            return {}
+        # The word cloud draws at most 100 words, so only those are handed over
+        return dict(self._compute_word_stats().most_common(100))
+    
+    def _render_charts(self, jobs) -> List[bytes]:
+        """Render chart jobs [(name, renderer, args), ...] to PNG bytes, keeping job order
         
-        wordcloud_path = downloads_dir / f"{filename_prefix}_wordcloud.png"
-        wordcloud.to_file(str(wordcloud_path))
+        Every renderer takes (data, *options). Charts already rendered from the same data
+        and options are served from the (bounded) cache instead of being rasterized again.
+        """
+        chart_images: List[Optional[bytes]] = [None] * len(jobs)
+        pending = []
+        for index, (_, render, args) in enumerate(jobs):
+            data, options = args[0], args[1:]
+            if isinstance(data, dict):
+                data = tuple(data.items())
+            elif isinstance(data, list):
+                data = tuple(data)
+            key = (render.__name__, data, options)
+            cached = self._chart_cache.get(key)
+            if cached is not None:
+                self._chart_cache.move_to_end(key)
+                chart_images[index] = cached
+            else:
+                pending.append((index, key, render, args))
         
-        return str(wordcloud_path)
+        # Rendered in-process: the app entry point also runs under __mp_main__, so worker processes would start it again
+        for index, key, render, args in pending:
+            png = render(*args)
+            self._chart_cache[key] = png
+            if len(self._chart_cache) > _CHART_CACHE_SIZE:
+                self._chart_cache.popitem(last=False)
+            chart_images[index] = png
+        return chart_images
     
-    def _add_pdf_header(self, pdf: FPDF):
+    def _add_pdf_header(self, pdf: 'FPDF'):
         """Add header with logo and title to PDF"""
         # Add logo if available
         logo_path = Path(__file__).parent.parent / "assets" / "images" / "logo.png"
@@ -366,7 +497,7 @@ class ExportService:
         
         pdf.ln(10)
     
-    def _add_executive_summary(self, pdf: FPDF):
+    def _add_executive_summary(self, pdf: 'FPDF'):
         """Add executive summary to PDF"""
         pdf.set_font(self._pdf_font_family, 'B', 16)
         pdf.set_text_color(0, 0, 0)
@@ -375,9 +506,10 @@ class ExportService:
         
         # Summary statistics
         total_paragraphs = len(self.app_state.paragraphs)
-        client_paragraphs = len(self.app_state.get_paragraphs_by_speaker('client'))
-        therapist_paragraphs = len(self.app_state.get_paragraphs_by_speaker('therapist'))
-        coded_paragraphs = len([p for p in self.app_state.paragraphs if p.codes])
+        speaker_counts = self.app_state.get_speaker_distribution()
+        client_paragraphs = speaker_counts['client']
+        therapist_paragraphs = speaker_counts['therapist']
+        coded_paragraphs = sum(1 for p in self.app_state.paragraphs if p.codes)
         
         pdf.set_font(self._pdf_font_family, '', 11)
         
@@ -395,16 +527,16 @@ The analysis includes word frequency analysis, sentiment distribution, speaker i
 and thematic coding to provide insights into the therapeutic conversation dynamics.
         """.strip()
         
-        # Split text into lines and add to PDF
-        for line in summary_text.split('\n'):
-            if line.strip():
-                pdf.cell(0, 6, self._sanitize_text(line.strip()), 0, 1, 'L')
-            else:
+        # One multi_cell per block of lines; blank lines between blocks keep the short gap
+        for index, block in enumerate(summary_text.split('\n\n')):
+            if index:
                 pdf.ln(3)
+            lines = [line.strip() for line in block.split('\n') if line.strip()]
+            pdf.multi_cell(0, 6, self._sanitize_text_lines(lines), 0, 'L')
         
         pdf.ln(10)
     
-    def _add_analysis_results(self, pdf: FPDF):
+    def _add_analysis_results(self, pdf: 'FPDF'):
         """Add analysis results section to PDF"""
         pdf.set_font(self._pdf_font_family, 'B', 16)
         pdf.cell(0, 10, self._sanitize_text('Analysis Results'), 0, 1, 'L')
@@ -415,15 +547,13 @@ and thematic coding to provide insights into the therapeutic conversation dynami
         pdf.cell(0, 8, self._sanitize_text('Word Frequency Analysis'), 0, 1, 'L')
         pdf.set_font(self._pdf_font_family, '', 10)
         
-        all_text = ' '.join([p.text for p in self.app_state.paragraphs])
-        words = extract_meaningful_words(all_text)
-        word_counts = Counter(words)
+        word_counts = self._compute_word_stats()
         top_words = word_counts.most_common(10)
         
         if top_words:
             pdf.cell(0, 6, self._sanitize_text('Top 10 Most Frequent Words:'), 0, 1, 'L')
-            for i, (word, count) in enumerate(top_words, 1):
-                pdf.cell(0, 5, self._sanitize_text(f'{i}. {word}: {count} occurrences'), 0, 1, 'L')
+            lines = [f'{i}. {word}: {count} occurrences' for i, (word, count) in enumerate(top_words, 1)]
+            pdf.multi_cell(0, 5, self._sanitize_text_lines(lines), 0, 'L')
         
         pdf.ln(5)
         
@@ -436,10 +566,11 @@ and thematic coding to provide insights into the therapeutic conversation dynami
         total_sentiment = sum(sentiment_dist.values())
         
         if total_sentiment > 0:
-            for sentiment, count in sentiment_dist.items():
-                if count > 0:
-                    percentage = (count / total_sentiment) * 100
-                    pdf.cell(0, 5, self._sanitize_text(f'{sentiment.title()}: {count} paragraphs ({percentage:.1f}%)'), 0, 1, 'L')
+            lines = [
+                f'{sentiment.title()}: {count} paragraphs ({(count / total_sentiment) * 100:.1f}%)'
+                for sentiment, count in sentiment_dist.items() if count > 0
+            ]
+            pdf.multi_cell(0, 5, self._sanitize_text_lines(lines), 0, 'L')
         
         pdf.ln(5)
         
@@ -451,14 +582,15 @@ and thematic coding to provide insights into the therapeutic conversation dynami
         coding_dist = self.app_state.get_coding_distribution()
         if coding_dist:
             pdf.cell(0, 6, self._sanitize_text('Coding Distribution:'), 0, 1, 'L')
-            for code, count in list(coding_dist.items())[:10]:  # Top 10 codes
-                pdf.cell(0, 5, self._sanitize_text(f'- {code}: {count} paragraphs'), 0, 1, 'L')
+            top_codes = nlargest(10, coding_dist.items(), key=itemgetter(1))  # Top 10 codes
+            lines = [f'- {code}: {count} paragraphs' for code, count in top_codes]
+            pdf.multi_cell(0, 5, self._sanitize_text_lines(lines), 0, 'L')
         else:
             pdf.cell(0, 6, self._sanitize_text('No thematic coding applied to the transcript.'), 0, 1, 'L')
         
         pdf.ln(10)
     
-    def _add_transcript_sample(self, pdf: FPDF):
+    def _add_transcript_sample(self, pdf: 'FPDF'):
         """Add sample transcript data to PDF"""
         pdf.set_font(self._pdf_font_family, 'B', 16)
         pdf.cell(0, 10, self._sanitize_text('Transcript'), 0, 1, 'L')
@@ -478,25 +610,15 @@ and thematic coding to provide insights into the therapeutic conversation dynami
             
             pdf.set_font(self._pdf_font_family, 'B', 9)
             speaker_label = f"[{paragraph.speaker.upper()}]" if paragraph.speaker else "[UNKNOWN]"
-            pdf.cell(0, 5, self._sanitize_text(f'{i}. {speaker_label}'), 0, 1, 'L')
+            # Sanitize only the label so it stays cached; the numbering is plain ASCII
+            pdf.cell(0, 5, f'{i}. ' + self._sanitize_text(speaker_label), 0, 1, 'L')
             
             pdf.set_font(self._pdf_font_family, '', 9)
             # Truncate long paragraphs
             raw_text = paragraph.text[:200] + "..." if len(paragraph.text) > 200 else paragraph.text
             
-            # Split text into multiple lines if needed
-            words = raw_text.split()
-            current_line = ""
-            for word in words:
-                if len(current_line + " " + word) < 80:
-                    current_line += " " + word if current_line else word
-                else:
-                    if current_line:
-                        pdf.cell(0, 4, self._sanitize_text(current_line), 0, 1, 'L')
-                    current_line = word
-            
-            if current_line:
-                pdf.cell(0, 4, self._sanitize_text(current_line), 0, 1, 'L')
+            # Let FPDF wrap on the font's actual glyph widths
+            pdf.multi_cell(0, 4, self._sanitize_text(raw_text), 0, 'L')
             
             pdf.ln(2)
         
@@ -504,7 +626,7 @@ and thematic coding to provide insights into the therapeutic conversation dynami
             pdf.set_font(self._pdf_font_family, 'I', 9)
             pdf.cell(0, 5, self._sanitize_text(f'... and {len(self.app_state.paragraphs) - 5} more paragraphs'), 0, 1, 'L')
     
-    def _add_pdf_footer(self, pdf: FPDF):
+    def _add_pdf_footer(self, pdf: 'FPDF'):
         """Add footer to PDF"""
         pdf.ln(10)
         pdf.set_font(self._pdf_font_family, 'I', 8)
@@ -512,6 +634,10 @@ and thematic coding to provide insights into the therapeutic conversation dynami
         pdf.cell(0, 5, self._sanitize_text('Generated by Psymerique - Therapeutic Transcript Analysis Tool'), 0, 1, 'C')
         pdf.cell(0, 5, self._sanitize_text('For research and clinical analysis purposes'), 0, 1, 'C')
     
+    def _sanitize_text_lines(self, lines: List[str]) -> str:
+        """Sanitize each line and join them into one newline-separated block for multi_cell"""
+        return '\n'.join(_sanitize_pdf_text(line) for line in lines)
+    
     def _sanitize_text(self, text: str) -> str:
         """Replace or strip characters not supported by core fonts (Arial/Helvetica).
         
@@ -520,25 +646,4 @@ and thematic coding to provide insights into the therapeutic conversation dynami
         """
         if text is None:
             return ''
-        # Normalize newlines
-        text = text.replace('\r', ' ').replace('\n', ' ')
-        # Common Unicode to ASCII replacements
-        replacements = {
-            '\u2013': '-',   # en dash
-            '\u2014': '-',   # em dash
-            '\u2026': '...', # ellipsis
-            '\u2018': "'",   # left single quote
-            '\u2019': "'",   # right single quote
-            '\u201C': '"',   # left double quote
-            '\u201D': '"',   # right double quote
-            '\u00A0': ' ',   # non-breaking space
-        }
-        for k, v in replacements.items():
-            text = text.replace(k, v)
-        # Remove/replace any remaining unsupported characters
-        try:
-            text = text.encode('latin-1', 'ignore').decode('latin-1')
-        except Exception:
-            # As a last resort, strip non-ASCII
-            text = ''.join(ch for ch in text if ord(ch) < 128)
-        return text
+        return _sanitize_pdf_text(text)
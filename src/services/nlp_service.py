@@ -4,11 +4,256 @@ Placeholder implementations for sentiment analysis, entity recognition, etc.
 """
 
 from typing import List, Dict, Tuple
+from pathlib import Path
+import os
 import re
 import random
-import stanza
+import threading
+from functools import lru_cache
+from types import MappingProxyType
 from ..app_state import Entity
 
+try:
+    import re2
+    RE2_AVAILABLE = True
+except ImportError:
+    RE2_AVAILABLE = False
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+# RE2 matches in linear time (no backtracking); the entity patterns below are valid in both engines
+_regex = re2 if RE2_AVAILABLE else re
+
+# Enhanced patterns for better detection. Every pattern spells out the letter cases it
+# accepts ([A-Z][a-z]+, [AaPp][Mm], [A-Za-z...], capitalized month names), so they are
+# compiled case-sensitively: IGNORECASE would only widen the character classes, and for
+# PERSON it would turn any run of lowercase words into a name.
+# PERSON is scanned on its own: inside one alternation it would swallow the emails and
+# month-name dates that start with a capitalized word. Its quantifiers are bounded (words of
+# up to 21 letters, at most five words per name) so long capitalized runs stay cheap.
+_PERSON_RE = _regex.compile(r'\b[A-Z][a-z]{1,20}(?:\s+[A-Z][a-z]{1,20}){0,4}\b')
+_REGEX_PATTERN_SOURCES = (
+    ('DATE', r'\b(?:\d{1,2}[/-]\d{1,2}[/-]\d{2,4}|\d{4}[/-]\d{1,2}[/-]\d{1,2}|(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\s+\d{1,2},?\s+\d{4})\b'),
+    ('TIME', r'\b\d{1,2}:\d{2}(?::\d{2})?(?:\s*[AaPp][Mm])?\b'),
+    ('PHONE', r'\b(?:\+?1[-.\s]?)?\(?[0-9]{3}\)?[-.\s]?[0-9]{3}[-.\s]?[0-9]{4}\b'),
+    ('EMAIL', r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'),
+    ('MONEY', r'\$\d+(?:,\d{3})*(?:\.\d{2})?'),
+    ('PERCENT', r'\d+(?:\.\d+)?%'),
+)
+
+# The remaining patterns in one scan; the named group that matched (lastgroup) is the entity type
+_COMBINED_ENTITY_RE = _regex.compile(
+    '|'.join(f'(?P<{entity_type}>{pattern})' for entity_type, pattern in _REGEX_PATTERN_SOURCES)
+)
+
+# Common words that the PERSON pattern would otherwise match when capitalized (e.g. at the start of a sentence)
+_PERSON_STOPWORDS = frozenset({'the', 'and', 'but', 'for', 'with', 'this', 'that', 'they', 'them', 'their'})
+
+# Keyword lists for the placeholder heuristics, built once
+_POSITIVE_WORDS = frozenset({'happy', 'joy', 'good', 'great', 'wonderful', 'amazing', 'love', 'excellent'})
+_NEGATIVE_WORDS = frozenset({'sad', 'angry', 'bad', 'terrible', 'awful', 'hate', 'horrible', 'worst'})
+_THERAPIST_INDICATORS = (
+    'how does that make you feel',
+    'tell me more about',
+    'what do you think',
+    'can you describe',
+    'i understand',
+    'that sounds',
+    'from my perspective'
+)
+_CLIENT_INDICATORS = (
+    'i feel',
+    'i think',
+    'i believe',
+    'my problem',
+    'i\'m struggling',
+    'i don\'t know',
+    'it\'s hard'
+)
+
+# Word tokens of lowercased text, apostrophes kept so contractions stay whole
+_WORD_TOKEN_RE = re.compile(r"[\w']+")
+
+# Sentiment words matched on word boundaries, one scan per polarity
+_POSITIVE_RE = re.compile(r'\b(?:' + '|'.join(map(re.escape, sorted(_POSITIVE_WORDS))) + r')\b', re.IGNORECASE)
+_NEGATIVE_RE = re.compile(r'\b(?:' + '|'.join(map(re.escape, sorted(_NEGATIVE_WORDS))) + r')\b', re.IGNORECASE)
+
+# Indicator phrases matched on word boundaries in a single findall per list
+_THERAPIST_RE = re.compile(r'\b(?:' + '|'.join(map(re.escape, _THERAPIST_INDICATORS)) + r')\b')
+_CLIENT_RE = re.compile(r'\b(?:' + '|'.join(map(re.escape, _CLIENT_INDICATORS)) + r')\b')
+
+
+def _build_phrase_automaton(phrases: Dict[str, object]):
+    """Aho-Corasick automaton yielding (phrase, payload) per occurrence, or None without pyahocorasick or phrases"""
+    if not AHOCORASICK_AVAILABLE or not phrases:
+        return None
+    automaton = ahocorasick.Automaton()
+    for phrase, payload in phrases.items():
+        automaton.add_word(phrase, (phrase, payload))
+    automaton.make_automaton()
+    return automaton
+
+
+def _is_word_char(char: str) -> bool:
+    """Whether char counts as a word character for \\b (letters, digits, underscore)"""
+    return char.isalnum() or char == '_'
+
+
+def _whole_phrase_matches(automaton, text: str):
+    """(phrase, payload) for each automaton hit not embedded in a longer word, like the \\b-bounded regexes"""
+    for end, value in automaton.iter(text):
+        start = end - len(value[0]) + 1
+        if start > 0 and _is_word_char(text[start - 1]):
+            continue
+        if end + 1 < len(text) and _is_word_char(text[end + 1]):
+            continue
+        yield value
+
+
+# All speaker indicators in one automaton, so a single pass finds both lists' phrases
+_SPEAKER_AUTOMATON = _build_phrase_automaton({
+    **dict.fromkeys(_THERAPIST_INDICATORS, 'therapist'),
+    **dict.fromkeys(_CLIENT_INDICATORS, 'client')
+})
+
+
+@lru_cache(maxsize=256)
+def _keyword_index(keywords: Tuple[str, ...]) -> Tuple[frozenset, Tuple[str, ...]]:
+    """Split coding keywords into a lowercased single-word set and a tuple of multi-word phrases"""
+    lowered = [keyword.lower() for keyword in keywords]
+    return (
+        frozenset(keyword for keyword in lowered if _WORD_TOKEN_RE.fullmatch(keyword)),
+        tuple(keyword for keyword in lowered if not _WORD_TOKEN_RE.fullmatch(keyword))
+    )
+
+
+@lru_cache(maxsize=64)
+def _scheme_keyword_index(
+    scheme_keywords: Tuple[Tuple[str, ...], ...]
+) -> Tuple[Dict[str, Tuple[int, ...]], Tuple[Tuple[str, ...], ...], object]:
+    """
+    Inverted index over all schemes: single word -> positions of the schemes listing it,
+    the per-scheme phrases, and (with pyahocorasick) one automaton over all phrases
+    """
+    word_schemes: Dict[str, List[int]] = {}
+    phrase_schemes: Dict[str, List[int]] = {}
+    phrases = []
+    for index, keywords in enumerate(scheme_keywords):
+        words, scheme_phrases = _keyword_index(keywords)
+        for word in words:
+            word_schemes.setdefault(word, []).append(index)
+        for phrase in scheme_phrases:
+            phrase_schemes.setdefault(phrase, []).append(index)
+        phrases.append(scheme_phrases)
+    phrase_automaton = _build_phrase_automaton(
+        {phrase: tuple(indices) for phrase, indices in phrase_schemes.items()}
+    )
+    return {word: tuple(indices) for word, indices in word_schemes.items()}, tuple(phrases), phrase_automaton
+
+
+def _doc_entity_spans(doc) -> Tuple[Tuple[str, str, int, int], ...]:
+    """Raw (text, Stanza type, start, end) spans of the entities in a processed Stanza document"""
+    return tuple(
+        (entity.text, entity.type, entity.start_char, entity.end_char)
+        for sentence in doc.sentences
+        for entity in sentence.ents
+    )
+
+
+@lru_cache(maxsize=1024)
+def _stanza_ner_spans(pipeline, text: str) -> Tuple[Tuple[str, str, int, int], ...]:
+    """Run Stanza NER once per (pipeline, text) and keep the raw (text, type, start, end) spans"""
+    return _doc_entity_spans(pipeline(text))
+
+
+def _may_contain_names(text: str) -> bool:
+    """Cheap pre-check before NER: at least 3 non-blank characters and some uppercase letter"""
+    return len(text.strip()) >= 3 and text != text.lower()
+
+
+# Sentence-ending punctuation folded to '.' for get_text_statistics
+_SENTENCE_END_TABLE = str.maketrans('!?', '..')
+
+
+# The keyword heuristics are pure functions of the text, so results are memoized for
+# segments that are analyzed again (e.g. on every UI refresh)
+@lru_cache(maxsize=4096)
+def _analyze_sentiment(text: str) -> str:
+    """Keyword-based sentiment label for NLPService.analyze_sentiment"""
+    # Placeholder implementation
+    # In practice, this would use a trained sentiment analysis model
+    
+    # Simple keyword-based approach for demonstration: every occurrence counts
+    positive_count = len(_POSITIVE_RE.findall(text))
+    negative_count = len(_NEGATIVE_RE.findall(text))
+    
+    if positive_count > negative_count:
+        return 'positive'
+    elif negative_count > positive_count:
+        return 'negative'
+    elif positive_count > 0 and negative_count > 0:
+        return 'mixed'
+    else:
+        return 'neutral'
+
+
+@lru_cache(maxsize=4096)
+def _identify_speaker(text: str) -> str:
+    """Indicator-phrase speaker label for NLPService.identify_speaker"""
+    # Placeholder implementation
+    # In practice, this would use speaker identification models
+    
+    text_lower = text.lower()
+    
+    # Simple heuristics for demonstration: number of distinct indicators present
+    if _SPEAKER_AUTOMATON is not None:
+        found = set(_whole_phrase_matches(_SPEAKER_AUTOMATON, text_lower))
+        therapist_score = sum(1 for _, speaker in found if speaker == 'therapist')
+        client_score = len(found) - therapist_score
+    else:
+        therapist_score = len(set(_THERAPIST_RE.findall(text_lower)))
+        client_score = len(set(_CLIENT_RE.findall(text_lower)))
+    
+    if therapist_score > client_score:
+        return 'therapist'
+    elif client_score > therapist_score:
+        return 'client'
+    else:
+        return 'unknown'
+
+
+@lru_cache(maxsize=4096)
+def _text_statistics(text: str) -> Dict[str, int]:
+    """Basic text statistics for NLPService.get_text_statistics"""
+    word_count = len(text.split())
+    # '!' and '?' become '.', so a plain str.split finds the sentence segments without regex
+    sentence_count = sum(1 for s in text.translate(_SENTENCE_END_TABLE).split('.') if s.strip())
+    paragraph_count = sum(1 for p in text.split('\n\n') if p.strip())
+    
+    return {
+        'characters': len(text),
+        'words': word_count,
+        'sentences': sentence_count,
+        'paragraphs': paragraph_count,
+        'avg_words_per_sentence': word_count / max(sentence_count, 1),
+        'avg_sentences_per_paragraph': sentence_count / max(paragraph_count, 1)
+    }
+
+
+# Set once Stanza initialization has finished (successfully or not)
+NLP_READY = threading.Event()
+
+
+def stanza_models_available(lang: str = 'en') -> bool:
+    """Check on disk whether the Stanza tokenize and NER models are already downloaded"""
+    resources_dir = Path(os.environ.get('STANZA_RESOURCES_DIR', Path.home() / 'stanza_resources'))
+    model_dir = resources_dir / lang
+    return (model_dir / 'tokenize').is_dir() and (model_dir / 'ner').is_dir()
+
 
 class NLPService:
     """Service for natural language processing tasks"""
@@ -16,28 +261,80 @@ class NLPService:
     # Class-level variables for singleton-like behavior
     _shared_pipeline = None
     _shared_initialized = False
+    # Serializes loading so concurrent first callers wait for the pipeline
+    _init_lock = threading.Lock()
+    # Guards creation of the single background loading thread
+    _thread_lock = threading.Lock()
+    _init_thread = None
+    
+    # Stanza entity types -> our standardized types (read-only, shared by all instances)
+    _STANZA_TYPE_MAP = MappingProxyType({
+        'PERSON': 'PERSON',
+        'PER': 'PERSON',
+        'ORG': 'ORGANIZATION',
+        'ORGANIZATION': 'ORGANIZATION',
+        'GPE': 'LOCATION',
+        'LOCATION': 'LOCATION',
+        'LOC': 'LOCATION',
+        'DATE': 'DATE',
+        'TIME': 'TIME',
+        'MONEY': 'MONEY',
+        'PERCENT': 'PERCENT',
+        'PHONE': 'PHONE',
+        'EMAIL': 'EMAIL',
+        'MISC': 'MISC'
+    })
     
     def __init__(self):
-        # Use shared pipeline if available
-        self.nlp_pipeline = NLPService._shared_pipeline
-        self._stanza_initialized = NLPService._shared_initialized
-        
         # Other models (placeholders for now)
         self.sentiment_model = None
         self.speaker_model = None
+        
+        # Load the pipeline off the caller's thread unless a load is already underway
+        NLPService.start_background_initialization()
     
-    def _initialize_stanza(self):
-        """Initialize Stanza NLP pipeline with optimized settings"""
-        if self._stanza_initialized or NLPService._shared_initialized:
-            if NLPService._shared_pipeline:
-                self.nlp_pipeline = NLPService._shared_pipeline
-                self._stanza_initialized = True
+    @property
+    def nlp_pipeline(self):
+        """The shared Stanza pipeline, read at call time (None until loaded, or if loading failed)"""
+        return NLPService._shared_pipeline
+    
+    @classmethod
+    def start_background_initialization(cls):
+        """Start loading the shared Stanza pipeline in a daemon thread (once per process)"""
+        with cls._thread_lock:
+            if cls._init_thread is not None or NLP_READY.is_set():
+                return
+            cls._init_thread = threading.Thread(target=cls._initialize_stanza, daemon=True)
+        cls._init_thread.start()
+    
+    @classmethod
+    def _initialize_stanza(cls):
+        """Load the shared Stanza pipeline once; callers arriving mid-load wait until it is ready"""
+        with cls._init_lock:
+            if cls._shared_initialized:
+                return
+            cls._shared_initialized = True
+            try:
+                cls._load_pipeline()
+            finally:
+                NLP_READY.set()
+    
+    @classmethod
+    def _load_pipeline(cls):
+        """Initialize Stanza NLP pipeline with optimized settings, downloading the models on first run"""
+        try:
+            # Imported lazily so app startup does not pay for loading Stanza/torch
+            import stanza
+        except ImportError as e:
+            print(f" Could not import Stanza: {e}")
+            print(" Falling back to regex-based extraction")
             return
-            
-        NLPService._shared_initialized = True
-        self._stanza_initialized = True
         
         try:
+            # Models are checked on disk; this is the only place that downloads them
+            if not stanza_models_available('en'):
+                print(" Downloading Stanza model (first time only)...")
+                stanza.download('en', verbose=False)
             # Try to initialize with minimal processors and no verbose output
             pipeline = stanza.Pipeline(
                 'en', 
@@ -46,12 +343,12 @@ class NLPService:
                 verbose=False,
                 use_gpu=False  # Force CPU to avoid GPU initialization overhead
             )
-            NLPService._shared_pipeline = pipeline
-            self.nlp_pipeline = pipeline
+            cls._warmup_pipeline(pipeline)
+            cls._shared_pipeline = pipeline
             print(" Stanza pipeline initialized successfully")
         except Exception:
             try:
-                # If model not found, download with minimal output
+                # Incomplete model files: download again with minimal output
                 print(" Downloading Stanza model (first time only)...")
                 stanza.download('en', verbose=False)
                 pipeline = stanza.Pipeline(
@@ -60,72 +357,53 @@ class NLPService:
                     verbose=False,
                     use_gpu=False
                 )
-                NLPService._shared_pipeline = pipeline
-                self.nlp_pipeline = pipeline
+                cls._warmup_pipeline(pipeline)
+                cls._shared_pipeline = pipeline
                 print(" Stanza model downloaded and initialized")
             except Exception as e:
                 print(f" Could not initialize Stanza: {e}")
                 print(" Falling back to regex-based extraction")
-                NLPService._shared_pipeline = None
-                self.nlp_pipeline = None
+                cls._shared_pipeline = None
+
+    @staticmethod
+    def _warmup_pipeline(pipeline):
+        """Run a tiny document through the pipeline so the first real call skips lazy setup"""
+        try:
+            pipeline('Warm up.')
+        except Exception as e:
+            print(f" Stanza warmup skipped: {e}")
 
     def analyze_sentiment(self, text: str) -> str:
         """
         Analyze sentiment of text
         Returns: 'positive', 'negative', 'neutral', or 'mixed'
         """
-        # Placeholder implementation
-        # In practice, this would use a trained sentiment analysis model
-        
-        # Simple keyword-based approach for demonstration
-        positive_words = ['happy', 'joy', 'good', 'great', 'wonderful', 'amazing', 'love', 'excellent']
-        negative_words = ['sad', 'angry', 'bad', 'terrible', 'awful', 'hate', 'horrible', 'worst']
-        
-        text_lower = text.lower()
-        positive_count = sum(1 for word in positive_words if word in text_lower)
-        negative_count = sum(1 for word in negative_words if word in text_lower)
-        
-        if positive_count > negative_count:
-            return 'positive'
-        elif negative_count > positive_count:
-            return 'negative'
-        elif positive_count > 0 and negative_count > 0:
-            return 'mixed'
-        else:
-            return 'neutral'
+        return _analyze_sentiment(text)
     
     def extract_entities(self, text: str) -> List[Entity]:
         """
         Extract named entities from text using Stanza NER with regex fallback
         Returns list of Entity objects
         """
+        return self._run_stanza_ner(text)
+    
+    def _run_stanza_ner(self, text: str) -> List[Entity]:
+        """Shared Stanza NER path with regex fallback for extract_entities and extract_entities_with_stanza"""
+        # Without an uppercase letter there are no names for NER to find; only the
+        # pattern-based types (dates, emails, ...) are checked
+        if not _may_contain_names(text):
+            return self._extract_entities_regex(text, include_persons=False)
+        
         entities = []
         
-        # Initialize Stanza only when needed
-        if not self._stanza_initialized:
+        # Waits for a load already in progress, or loads the pipeline now
+        if not NLP_READY.is_set():
             self._initialize_stanza()
         
         if self.nlp_pipeline:
             try:
-                # Use Stanza for entity extraction
-                doc = self.nlp_pipeline(text)
-                
-                for sentence in doc.sentences:
-                    for entity in sentence.ents:
-                        # Map Stanza entity types to our types
-                        entity_type = self._map_stanza_entity_type(entity.type)
-                        
-                        # Calculate character positions
-                        start_pos = entity.start_char
-                        end_pos = entity.end_char
-                        
-                        entities.append(Entity(
-                            text=entity.text,
-                            entity_type=entity_type,
-                            start_pos=start_pos,
-                            end_pos=end_pos
-                        ))
-                        
+                # Use Stanza for entity extraction (memoized per pipeline and text)
+                entities = self._entities_from_spans(_stanza_ner_spans(self.nlp_pipeline, text))
             except Exception as e:
                 print(f"Error in Stanza entity extraction: {e}")
                 # Fall back to regex-based extraction
@@ -136,144 +414,97 @@ class NLPService:
         
         return entities
     
-    def extract_entities_with_stanza(self, text: str) -> List[Entity]:
+    def extract_entities_batch(self, texts: List[str], batch_size: int = 32) -> List[List[Entity]]:
         """
-        Extract entities using Stanza NER (slower but more accurate)
-        Only use this method when high accuracy is required
+        Extract named entities from several texts, running Stanza on batch_size documents per call
+        Returns one list of Entity objects per input text
         """
-        entities = []
-        
-        # Initialize Stanza only when explicitly requested
-        if not self._stanza_initialized:
+        # Waits for a load already in progress, or loads the pipeline now
+        if not NLP_READY.is_set():
             self._initialize_stanza()
         
-        if self.nlp_pipeline:
+        # Texts that cannot contain names skip the pipeline (see extract_entities)
+        results: List[List[Entity]] = [
+            None if _may_contain_names(text) else self._extract_entities_regex(text, include_persons=False)
+            for text in texts
+        ]
+        pending = [index for index, entities in enumerate(results) if entities is None]
+        
+        if not self.nlp_pipeline:
+            # Fall back to regex-based extraction
+            for index in pending:
+                results[index] = self._extract_entities_regex(texts[index])
+            return results
+        
+        import stanza
+        
+        for start in range(0, len(pending), batch_size):
+            batch = pending[start:start + batch_size]
             try:
-                # Use Stanza for entity extraction
-                doc = self.nlp_pipeline(text)
-                
-                for sentence in doc.sentences:
-                    for entity in sentence.ents:
-                        # Map Stanza entity types to our types
-                        entity_type = self._map_stanza_entity_type(entity.type)
-                        
-                        # Calculate character positions
-                        start_pos = entity.start_char
-                        end_pos = entity.end_char
-                        
-                        entities.append(Entity(
-                            text=entity.text,
-                            entity_type=entity_type,
-                            start_pos=start_pos,
-                            end_pos=end_pos
-                        ))
-                        
+                # A list of Documents is processed in one bulk pipeline call
+                docs = self.nlp_pipeline([stanza.Document([], text=texts[index]) for index in batch])
+                for index, doc in zip(batch, docs):
+                    results[index] = self._entities_from_doc(doc)
             except Exception as e:
                 print(f"Error in Stanza entity extraction: {e}")
                 # Fall back to regex-based extraction
-                return self._extract_entities_regex(text)
-        else:
-            # Fall back to regex-based extraction
-            return self._extract_entities_regex(text)
+                for index in batch:
+                    results[index] = self._extract_entities_regex(texts[index])
         
-        return entities
+        return results
+    
+    def _entities_from_doc(self, doc) -> List[Entity]:
+        """Convert the entities of a processed Stanza document to Entity objects"""
+        return self._entities_from_spans(_doc_entity_spans(doc))
     
-    def _map_stanza_entity_type(self, stanza_type: str) -> str:
-        """Map Stanza entity types to our standardized types"""
-        mapping = {
-            'PERSON': 'PERSON',
-            'PER': 'PERSON',
-            'ORG': 'ORGANIZATION',
-            'ORGANIZATION': 'ORGANIZATION',
-            'GPE': 'LOCATION',
-            'LOCATION': 'LOCATION',
-            'LOC': 'LOCATION',
-            'DATE': 'DATE',
-            'TIME': 'TIME',
-            'MONEY': 'MONEY',
-            'PERCENT': 'PERCENT',
-            'PHONE': 'PHONE',
-            'EMAIL': 'EMAIL',
-            'MISC': 'MISC'
-        }
-        return mapping.get(stanza_type, stanza_type)
+    def _entities_from_spans(self, spans) -> List[Entity]:
+        """Map raw (text, Stanza type, start, end) spans to fresh Entity objects (callers mutate them)"""
+        type_map = self._STANZA_TYPE_MAP
+        return [
+            Entity(
+                text=entity_text,
+                entity_type=type_map.get(stanza_type, stanza_type),
+                start_pos=start_pos,
+                end_pos=end_pos
+            )
+            for entity_text, stanza_type, start_pos, end_pos in spans
+        ]
+    
+    def extract_entities_with_stanza(self, text: str) -> List[Entity]:
+        """
+        Extract entities using Stanza NER (slower but more accurate)
+        Only use this method when high accuracy is required
+        """
+        return self._run_stanza_ner(text)
     
-    def _extract_entities_regex(self, text: str) -> List[Entity]:
+    def _extract_entities_regex(self, text: str, include_persons: bool = True) -> List[Entity]:
         """
         Fallback regex-based entity extraction
         """
-        entities = []
+        # Collect plain (text, type, start, end) tuples first and build the Entity objects in one go
+        spans = []
         
-        # Enhanced patterns for better detection
-        patterns = {
-            'PERSON': r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b',
-            'DATE': r'\b(?:\d{1,2}[/-]\d{1,2}[/-]\d{2,4}|\d{4}[/-]\d{1,2}[/-]\d{1,2}|(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\s+\d{1,2},?\s+\d{4})\b',
-            'TIME': r'\b\d{1,2}:\d{2}(?::\d{2})?(?:\s*[AaPp][Mm])?\b',
-            'PHONE': r'\b(?:\+?1[-.\s]?)?\(?[0-9]{3}\)?[-.\s]?[0-9]{3}[-.\s]?[0-9]{4}\b',
-            'EMAIL': r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b',
-            'MONEY': r'\$\d+(?:,\d{3})*(?:\.\d{2})?',
-            'PERCENT': r'\d+(?:\.\d+)?%'
-        }
+        if include_persons:
+            spans.extend(
+                (match.group(), 'PERSON', match.start(), match.end())
+                for match in _PERSON_RE.finditer(text)
+                # The pattern is case-sensitive but still matches capitalized stopwords at sentence starts ('The', 'But')
+                if match.group().lower() not in _PERSON_STOPWORDS
+            )
         
-        for entity_type, pattern in patterns.items():
-            matches = re.finditer(pattern, text, re.IGNORECASE)
-            for match in matches:
-                # Skip common words that might match person pattern
-                if entity_type == 'PERSON':
-                    word = match.group().lower()
-                    if word in ['the', 'and', 'but', 'for', 'with', 'this', 'that', 'they', 'them', 'their']:
-                        continue
-                
-                entity = Entity(
-                    text=match.group(),
-                    entity_type=entity_type,
-                    start_pos=match.start(),
-                    end_pos=match.end()
-                )
-                entities.append(entity)
+        spans.extend(
+            (match.group(), match.lastgroup, match.start(), match.end())
+            for match in _COMBINED_ENTITY_RE.finditer(text)
+        )
         
-        return entities
+        return [Entity(*span) for span in spans]
     
     def identify_speaker(self, text: str, context: List[str] = None) -> str:
         """
         Identify speaker of a text segment
         Returns: 'client', 'therapist', or 'unknown'
         """
-        # Placeholder implementation
-        # In practice, this would use speaker identification models
-        
-        text_lower = text.lower()
-        
-        # Simple heuristics for demonstration
-        therapist_indicators = [
-            'how does that make you feel',
-            'tell me more about',
-            'what do you think',
-            'can you describe',
-            'i understand',
-            'that sounds',
-            'from my perspective'
-        ]
-        
-        client_indicators = [
-            'i feel',
-            'i think',
-            'i believe',
-            'my problem',
-            'i\'m struggling',
-            'i don\'t know',
-            'it\'s hard'
-        ]
-        
-        therapist_score = sum(1 for indicator in therapist_indicators if indicator in text_lower)
-        client_score = sum(1 for indicator in client_indicators if indicator in text_lower)
-        
-        if therapist_score > client_score:
-            return 'therapist'
-        elif client_score > therapist_score:
-            return 'client'
-        else:
-            return 'unknown'
+        return _identify_speaker(text)
     
     def suggest_codes(self, text: str, coding_schemes: List) -> List[Tuple[str, float]]:
         """
@@ -282,13 +513,27 @@ class NLPService:
         """
         suggestions = []
         text_lower = text.lower()
+        tokens = set(_WORD_TOKEN_RE.findall(text_lower))
+        word_schemes, scheme_phrases, phrase_automaton = _scheme_keyword_index(
+            tuple(tuple(scheme.keywords) for scheme in coding_schemes)
+        )
         
-        for scheme in coding_schemes:
-            score = 0
-            for keyword in scheme.keywords:
-                if keyword.lower() in text_lower:
-                    score += 1
-            
+        # One pass over the text's tokens credits every scheme listing that word
+        scores = [0] * len(coding_schemes)
+        for token in tokens & word_schemes.keys():
+            for index in word_schemes[token]:
+                scores[index] += 1
+        
+        if phrase_automaton is not None:
+            # One Aho-Corasick pass finds every phrase present; each credits its schemes once
+            for _, indices in {value for _, value in phrase_automaton.iter(text_lower)}:
+                for index in indices:
+                    scores[index] += 1
+        else:
+            for index, phrases in enumerate(scheme_phrases):
+                scores[index] += sum(1 for phrase in phrases if phrase in text_lower)
+        
+        for scheme, score in zip(coding_schemes, scores):
             if score > 0:
                 # Normalize score by number of keywords
                 confidence = score / len(scheme.keywords) if scheme.keywords else 0
@@ -302,35 +547,24 @@ class NLPService:
         """
         Anonymize text by replacing entities with placeholders
         """
-        anonymized_text = text
+        # Walk entities left to right, collecting untouched slices and replacements, and join once
+        parts = []
+        cursor = 0
         
-        # Sort entities by start position in reverse order to avoid offset issues
-        sorted_entities = sorted(entities, key=lambda e: e.start_pos, reverse=True)
+        for entity in sorted(entities, key=lambda e: e.start_pos):
+            # Entities overlapping an already replaced span are skipped
+            if not entity.anonymized or entity.start_pos < cursor:
+                continue
+            parts.append(text[cursor:entity.start_pos])
+            parts.append(entity.replacement or f"[{entity.entity_type}]")
+            cursor = entity.end_pos
         
-        for entity in sorted_entities:
-            if entity.anonymized:
-                replacement = entity.replacement or f"[{entity.entity_type}]"
-                anonymized_text = (
-                    anonymized_text[:entity.start_pos] + 
-                    replacement + 
-                    anonymized_text[entity.end_pos:]
-                )
-        
-        return anonymized_text
+        parts.append(text[cursor:])
+        return ''.join(parts)
     
     def get_text_statistics(self, text: str) -> Dict[str, int]:
         """
         Get basic text statistics
         """
-        words = text.split()
-        sentences = re.split(r'[.!?]+', text)
-        paragraphs = text.split('\n\n')
-        
-        return {
-            'characters': len(text),
-            'words': len(words),
-            'sentences': len([s for s in sentences if s.strip()]),
-            'paragraphs': len([p for p in paragraphs if p.strip()]),
-            'avg_words_per_sentence': len(words) / max(len(sentences), 1),
-            'avg_sentences_per_paragraph': len(sentences) / max(len(paragraphs), 1)
-        }
+        # Copied so callers cannot modify the cached result
+        return dict(_text_statistics(text))
@@ -3,15 +3,59 @@ Therapeutic Model Service - Multi-language speaker identification and sentiment
 """
 
 import os
+import inspect
+import traceback
+import numpy as np
 import torch
 from transformers import AutoTokenizer, AutoConfig, DistilBertModel
 from pathlib import Path
 import logging
 import json
+from collections import OrderedDict
+from functools import lru_cache
 
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=1)
+def _model_root():
+    """Directory holding the model weights, tokenizer and config"""
+    return Path(__file__).resolve().parent.parent / "Model"
+
+
+@lru_cache(maxsize=1)
+def _default_device():
+    """Inference device, probed once per process"""
+    return torch.device("cuda" if torch.cuda.is_available() else "cpu")
+
+# Number of recent analyze_text results kept per service (identify_speaker + analyze_sentiment
+# on the same text, repeated paragraphs, retries)
+_RESULT_CACHE_SIZE = 512
+
+# Dtype of the token ids and attention masks fed to the model: ids stay far below 2**31, and int32
+# halves the host->device bytes of the tokenizer's int64 (ONNX Runtime inputs are widened back)
+_INPUT_DTYPE = torch.int32
+
+try:
+    import onnx  # required by torch.onnx.export
+    import onnxruntime
+    ONNXRUNTIME_AVAILABLE = True
+except ImportError:
+    ONNXRUNTIME_AVAILABLE = False
+
+try:
+    import intel_extension_for_pytorch as ipex
+    IPEX_AVAILABLE = True
+except ImportError:
+    IPEX_AVAILABLE = False
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+
 class TherapeuticBertModel(torch.nn.Module):
     """Custom therapeutic BERT model with direct weight loading pattern"""
     
@@ -44,13 +88,50 @@ class TherapeuticBertModel(torch.nn.Module):
 class TherapeuticModelService:
     """Service for therapeutic BERT model handling speaker identification and sentiment analysis"""
     
+    # One service (and one loaded model) per process, shared by every component that creates one
+    _shared_instance = None
+    
+    def __new__(cls):
+        if cls._shared_instance is None:
+            cls._shared_instance = super().__new__(cls)
+        return cls._shared_instance
+    
     def __init__(self):
+        # The shared instance is already set up
+        if getattr(self, '_initialized', False):
+            return
+        self._initialized = True
+        
         self.model = None
         self.tokenizer = None
-        self.model_path = Path(__file__).parent.parent / "Model"
-        self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-        self.speaker_labels = ['Client', 'Therapist']
-        self.sentiment_labels = ['Positive', 'Negative', 'Neutral', 'Mixed']
+        # Embedding table size, kept as a plain int so it survives TorchScript freezing
+        self.num_embeddings = None
+        # True when every tokenizer id is known to fit the embedding table (set at load time)
+        self._skip_embed_check = False
+        # ONNX Runtime session used instead of self.model for inference (PSY_ONNX)
+        self._ort_session = None
+        # Reused pinned host / device input buffers for single-text CUDA inference
+        self._ids_buf = None
+        self._mask_buf = None
+        self._ids_dev = None
+        self._mask_dev = None
+        self.model_path = _model_root()
+        self.device = _default_device()
+        self.speaker_labels = ('Client', 'Therapist')
+        self.sentiment_labels = ('Positive', 'Negative', 'Neutral', 'Mixed')
+        # Result labels, lowercased once instead of on every analysis
+        self._speaker_labels_lower = tuple(label.lower() for label in self.speaker_labels)
+        self._sentiment_labels_lower = tuple(label.lower() for label in self.sentiment_labels)
+        # Token cap per text: therapy utterances are mostly short and attention cost grows with length squared
+        self.max_length = int(os.getenv('PSY_MAX_LEN', '128'))
+        # FP16 autocast on CUDA (tensor-core GEMMs; LayerNorm/softmax stay FP32). Disable with PSY_AMP=0
+        self.use_amp = self.device.type == 'cuda' and os.getenv('PSY_AMP', '1') == '1'
+        self.amp_dtype = torch.float16  # BF16 on CPU when PSY_IPEX is in effect
+        # LRU of text -> analyze_text result
+        self._result_cache = OrderedDict()
+        # Most recent (text, result), for identify_speaker + analyze_sentiment on the same text
+        self._last_text = None
+        self._last_result = None
         
         # Initialize model on startup
         self._initialize_model()
@@ -72,32 +153,65 @@ class TherapeuticModelService:
                 local_files_only=True
             )
 
-            # Load local config to avoid remote downloads
+            # Load local config to avoid remote downloads. Attention runs through
+            # torch.nn.functional.scaled_dot_product_attention (fused kernel) instead of the
+            # explicit matmul/softmax path; transformers releases without SDPA support for
+            # DistilBERT ignore the setting
             logger.info("Loading local DistilBERT config...")
-            config = AutoConfig.from_pretrained(str(self.model_path), local_files_only=True)
+            config = AutoConfig.from_pretrained(str(self.model_path), local_files_only=True, attn_implementation='sdpa')
 
-            logger.info("Instantiating TherapeuticBertModel...")
-            self.model = TherapeuticBertModel(tokenizer=self.tokenizer, num_speaker=2, num_sentiment=4, config=config)
-
-            # Load state dict from safetensors
+            # Locate the weights before building the model
             from safetensors.torch import load_file
             model_file = self.model_path / "model.safetensors"
             if not model_file.exists():
                 logger.error("model.safetensors not found")
                 return False
 
+            # Built on the meta device: the random initialization allocates nothing, since the
+            # checkpoint tensors become the parameters below
+            logger.info("Instantiating TherapeuticBertModel...")
+            with torch.device('meta'):
+                self.model = TherapeuticBertModel(tokenizer=self.tokenizer, num_speaker=2, num_sentiment=4, config=config)
+            self.num_embeddings = self.model.bert.get_input_embeddings().num_embeddings
+            # The embeddings were resized to len(tokenizer), so its ids always fit and the
+            # per-call max() over the input ids can be skipped
+            self._skip_embed_check = len(self.tokenizer) <= self.num_embeddings
+            if not self._skip_embed_check:
+                logger.warning(f"Tokenizer vocabulary ({len(self.tokenizer)}) exceeds embedding size ({self.num_embeddings}); checking token ids per call")
+
+            # Load state dict from safetensors straight onto the target device; assign=True adopts
+            # those tensors as the parameters instead of copying them into preallocated ones
             logger.info("Loading weights from safetensors with strict=False...")
-            state_dict = load_file(str(model_file))
-            missing_keys, unexpected_keys = self.model.load_state_dict(state_dict, strict=False)
+            state_dict = load_file(str(model_file), device=str(self.device))
+            missing_keys, unexpected_keys = self.model.load_state_dict(state_dict, strict=False, assign=True)
 
             if missing_keys:
                 logger.info(f"Missing keys: {missing_keys}")
             if unexpected_keys:
                 logger.info(f"Unexpected keys: {unexpected_keys}")
 
+            # position_ids is a non-persistent buffer (never in the checkpoint), so it is rebuilt for real
+            embeddings = self.model.bert.embeddings
+            if hasattr(embeddings, 'position_ids'):
+                embeddings.register_buffer(
+                    'position_ids',
+                    torch.arange(config.max_position_embeddings, device=self.device).expand((1, -1)),
+                    persistent=False
+                )
+            # Anything else the checkpoint did not provide has no values at all on the meta device
+            still_meta = [name for name, tensor in [*self.model.named_parameters(), *self.model.named_buffers()] if tensor.is_meta]
+            if still_meta:
+                raise RuntimeError(f"Checkpoint does not provide: {still_meta}")
+
             # Finalize
             self.model.to(self.device)
             self.model.eval()
+            self._optimize_model()
+            if self.device.type == 'cuda':
+                self._ids_buf = torch.zeros(1, self.max_length, dtype=_INPUT_DTYPE, pin_memory=True)
+                self._mask_buf = torch.zeros(1, self.max_length, dtype=_INPUT_DTYPE, pin_memory=True)
+                self._ids_dev = torch.zeros(1, self.max_length, dtype=_INPUT_DTYPE, device=self.device)
+                self._mask_dev = torch.zeros(1, self.max_length, dtype=_INPUT_DTYPE, device=self.device)
             logger.info("✅ Therapeutic BERT model loaded successfully!")
             logger.info(f"Device: {self.device}")
             logger.info(f"Speaker labels: {self.speaker_labels}")
@@ -105,7 +219,6 @@ class TherapeuticModelService:
             return True
         except Exception as e:
             logger.error(f"❌ Error loading therapeutic model: {str(e)}")
-            import traceback
             logger.error(f"Full traceback: {traceback.format_exc()}")
             # Fallback to simple approach
             try:
@@ -115,6 +228,146 @@ class TherapeuticModelService:
             except:
                 return False
     
+    def _optimize_model(self):
+        """Apply the optional inference-time optimizations to the loaded model"""
+        # ONNX Runtime on CPU: constant folding plus attention/LayerNorm/GELU fusion on MLAS kernels.
+        # Opt in with PSY_ONNX=1, or PSY_ONNX=int8 to add ONNX Runtime's int8 weight quantization;
+        # the PyTorch-side optimizations below do not apply to the session
+        if os.getenv('PSY_ONNX') in ('1', 'int8') and ONNXRUNTIME_AVAILABLE and self.device.type == 'cpu':
+            try:
+                self._ort_session = self._export_onnx()
+                logger.info("Using ONNX Runtime for inference")
+                return
+            except Exception as e:
+                logger.warning(f"ONNX Runtime setup failed, using PyTorch: {str(e)}")
+        
+        # Intel Extension for PyTorch on CPU: BF16 weights plus fused MHA, Linear+GELU and Add+LayerNorm
+        # kernels (AVX-512 BF16 / AMX), traced and frozen under BF16 autocast. Opt in with PSY_IPEX=1
+        if os.getenv('PSY_IPEX') == '1' and IPEX_AVAILABLE and self.device.type == 'cpu':
+            try:
+                logger.info("Optimizing model with Intel Extension for PyTorch (BF16)...")
+                # Inference only; grad-free parameters let freeze fold the autocast weight casts into constants
+                optimized = ipex.optimize(self.model.requires_grad_(False), dtype=torch.bfloat16, level='O1')
+                example = self.tokenizer("warmup", return_tensors='pt', padding='max_length', max_length=64, truncation=True)
+                example_inputs = (example['input_ids'].to(self.device, _INPUT_DTYPE), example['attention_mask'].to(self.device, _INPUT_DTYPE))
+                with torch.no_grad(), torch.autocast(device_type='cpu', dtype=torch.bfloat16):
+                    traced = torch.jit.freeze(torch.jit.trace(optimized, example_inputs, strict=False))
+                    # The first runs select IPEX's kernels; do them here rather than on the first request
+                    for _ in range(2):
+                        traced(*example_inputs)
+                self.model = traced
+                self.use_amp = True
+                self.amp_dtype = torch.bfloat16
+                return
+            except Exception as e:
+                logger.warning(f"IPEX optimization skipped: {str(e)}")
+        
+        # Dynamic int8 quantization (Q8BERT-style) of every nn.Linear: attention/FFN projections and both
+        # heads. The int8 GEMM kernels are CPU-only, so it is skipped on CUDA. Opt in with PSY_QUANT=dynamic
+        if os.getenv('PSY_QUANT') == 'dynamic' and self.device.type == 'cpu':
+            logger.info("Applying dynamic int8 quantization to Linear layers...")
+            self.model = torch.ao.quantization.quantize_dynamic(self.model, {torch.nn.Linear}, dtype=torch.qint8)
+        
+        # torch.compile (Inductor) fuses the pointwise chains and drops per-op Python overhead;
+        # dynamic=True since tokenized lengths vary between calls. Compilation takes tens of
+        # seconds, so it is opt-in (PSY_COMPILE=1) and replaces the TorchScript step below
+        if os.getenv('PSY_COMPILE') == '1' and hasattr(torch, 'compile'):
+            try:
+                logger.info("Compiling model with torch.compile...")
+                compiled = torch.compile(self.model, mode='reduce-overhead', dynamic=True)
+                # Warm up so the compilation happens here rather than on the first request; a single
+                # text and a batch, since a batch size of 1 is compiled as its own specialization.
+                # Inputs are tokenized outside inference_mode, as in analyze_text, to match its guards
+                for warmup_texts in (["Warm up the compiled model."], ["Warm up the compiled model.", "And its batches."]):
+                    example = self.tokenizer(warmup_texts, return_tensors='pt', padding=True)
+                    with torch.inference_mode():
+                        compiled(example['input_ids'].to(self.device, _INPUT_DTYPE), example['attention_mask'].to(self.device, _INPUT_DTYPE))
+                self.model = compiled
+                return
+            except Exception as e:
+                logger.warning(f"torch.compile skipped: {str(e)}")
+        
+        # TorchScript: trace once, freeze (weights become constants) and let optimize_for_inference
+        # fuse Linear+GELU, Add+LayerNorm and attention ops. Disable with PSY_JIT=0
+        if os.getenv('PSY_JIT', '1') == '1':
+            try:
+                logger.info("Tracing and freezing model with TorchScript...")
+                example = self.tokenizer("warmup", return_tensors='pt', padding='max_length', max_length=64, truncation=True)
+                example_inputs = (example['input_ids'].to(self.device, _INPUT_DTYPE), example['attention_mask'].to(self.device, _INPUT_DTYPE))
+                with torch.no_grad():
+                    traced = torch.jit.trace(self.model, example_inputs, strict=False)
+                    self.model = torch.jit.optimize_for_inference(torch.jit.freeze(traced))
+            except Exception as e:
+                logger.warning(f"TorchScript optimization skipped, using eager model: {str(e)}")
+    
+    def _export_onnx(self):
+        """
+        Export the eager model to ONNX and open an ONNX Runtime CPU session on it
+        The export is kept next to the weights and redone only when the weights are newer
+        """
+        weights_file = self.model_path / "model.safetensors"
+        onnx_file = self.model_path / "model.onnx"
+        if not onnx_file.exists() or onnx_file.stat().st_mtime < weights_file.stat().st_mtime:
+            logger.info("Exporting model to ONNX...")
+            example = self.tokenizer(["warmup", "warmup text"], return_tensors='pt', padding=True)
+            dynamic_axes = {name: {0: 'batch', 1: 'sequence'} for name in ('input_ids', 'attention_mask')}
+            dynamic_axes.update({name: {0: 'batch'} for name in ('speaker_logits', 'sentiment_logits')})
+            export_options = {}
+            if 'dynamo' in inspect.signature(torch.onnx.export).parameters:
+                # Newer PyTorch defaults to the dynamo exporter; the TorchScript one needs no onnxscript
+                export_options['dynamo'] = False
+            with torch.no_grad():
+                torch.onnx.export(
+                    self.model,
+                    (example['input_ids'], example['attention_mask']),
+                    str(onnx_file),
+                    opset_version=17,
+                    input_names=['input_ids', 'attention_mask'],
+                    output_names=['speaker_logits', 'sentiment_logits'],
+                    dynamic_axes=dynamic_axes,
+                    **export_options
+                )
+        
+        if os.getenv('PSY_ONNX') == 'int8':
+            int8_file = self.model_path / "model.int8.onnx"
+            if not int8_file.exists() or int8_file.stat().st_mtime < onnx_file.stat().st_mtime:
+                logger.info("Quantizing ONNX model to int8...")
+                from onnxruntime.quantization import quantize_dynamic, QuantType
+                quantize_dynamic(str(onnx_file), str(int8_file), weight_type=QuantType.QInt8)
+            onnx_file = int8_file
+        
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = os.cpu_count()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        return onnxruntime.InferenceSession(str(onnx_file), options, providers=['CPUExecutionProvider'])
+    
+    def _inputs_to_device(self, inputs):
+        """Move a single tokenized text to the device, through the persistent buffers when allocated"""
+        if self._ids_dev is None:
+            return {k: v.to(self.device, _INPUT_DTYPE) for k, v in inputs.items()}
+        # Fill the leading slice of the pinned buffers and copy it asynchronously into the device
+        # buffers; the slice keeps the unpadded length, so attention cost is unchanged
+        length = inputs['input_ids'].shape[1]
+        self._ids_buf[:, :length].copy_(inputs['input_ids'])
+        self._mask_buf[:, :length].copy_(inputs['attention_mask'])
+        self._ids_dev[:, :length].copy_(self._ids_buf[:, :length], non_blocking=True)
+        self._mask_dev[:, :length].copy_(self._mask_buf[:, :length], non_blocking=True)
+        return {'input_ids': self._ids_dev[:, :length], 'attention_mask': self._mask_dev[:, :length]}
+    
+    def _forward(self, input_ids, attention_mask):
+        """Run the model, or its ONNX Runtime session, and return the speaker and sentiment logits"""
+        if self._ort_session is not None:
+            speaker_logits, sentiment_logits = self._ort_session.run(
+                None, {'input_ids': input_ids.cpu().numpy().astype(np.int64), 'attention_mask': attention_mask.cpu().numpy().astype(np.int64)}
+            )
+            return {'speaker_logits': torch.from_numpy(speaker_logits), 'sentiment_logits': torch.from_numpy(sentiment_logits)}
+        if self.use_amp:
+            with torch.autocast(device_type=self.device.type, dtype=self.amp_dtype):
+                outputs = self.model(input_ids, attention_mask)
+            # Confidences are computed from FP32 logits
+            return {name: logits.float() for name, logits in outputs.items()}
+        return self.model(input_ids, attention_mask)
+    
     def is_available(self):
         """Check if the model is available for use"""
         return self.model is not None and self.tokenizer is not None
@@ -125,6 +378,7 @@ class TherapeuticModelService:
             'model_available': self.model is not None,
             'tokenizer_available': self.tokenizer is not None,
             'model_type': type(self.model).__name__ if self.model else None,
+            'onnx_runtime': self._ort_session is not None,
             'device': str(self.device),
             'model_path': str(self.model_path),
             'model_path_exists': self.model_path.exists(),
@@ -161,7 +415,6 @@ class TherapeuticModelService:
             
         except Exception as e:
             logger.error(f"❌ Model test failed: {str(e)}")
-            import traceback
             logger.error(f"Test traceback: {traceback.format_exc()}")
             return False
     
@@ -184,10 +437,10 @@ class TherapeuticModelService:
                 return True
             
             # Test the exact pattern the user described
-            inputs = self.tokenizer(test_text, return_tensors='pt', padding=True, truncation=True)
+            inputs = self.tokenizer(test_text, return_tensors='pt', padding=False, truncation=True, max_length=self.max_length)
             
-            with torch.no_grad():
-                outputs = self.model(inputs['input_ids'], inputs['attention_mask'])
+            with torch.inference_mode():
+                outputs = self._forward(inputs['input_ids'].to(self.device, _INPUT_DTYPE), inputs['attention_mask'].to(self.device, _INPUT_DTYPE))
                 speaker_pred = torch.argmax(outputs['speaker_logits'])
                 sentiment_pred = torch.argmax(outputs['sentiment_logits'])
                 
@@ -213,7 +466,6 @@ class TherapeuticModelService:
             
         except Exception as e:
             logger.error(f"❌ Simple test failed: {str(e)}")
-            import traceback
             logger.error(f"Simple test traceback: {traceback.format_exc()}")
             return False
     
@@ -227,6 +479,28 @@ class TherapeuticModelService:
         Returns:
             dict: Dictionary with speaker and sentiment predictions
         """
+        # Same text as the previous call: skip the LRU lookup and reordering
+        if self._last_result is not None and text == self._last_text:
+            # Copy so callers cannot alter the cached entry
+            return dict(self._last_result)
+        
+        cached = self._result_cache.get(text)
+        if cached is not None:
+            self._result_cache.move_to_end(text)
+            self._last_text, self._last_result = text, cached
+            return dict(cached)
+        
+        result = self._analyze_uncached(text)
+        if self.is_available():
+            cached = dict(result)
+            self._result_cache[text] = cached
+            self._last_text, self._last_result = text, cached
+            if len(self._result_cache) > _RESULT_CACHE_SIZE:
+                self._result_cache.popitem(last=False)
+        return result
+    
+    def _analyze_uncached(self, text):
+        """Run the model (or its fallbacks) for analyze_text"""
         if not self.is_available():
             logger.warning("Therapeutic model not available")
             return {
@@ -252,91 +526,98 @@ class TherapeuticModelService:
                     'sentiment_confidence': 0.0
                 }
             
-            logger.debug(f"Analyzing text: '{text[:100]}...' (length: {len(text)})")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Analyzing text: '%s...' (length: %d)", text[:100], len(text))
             
             # Tokenize input
             logger.debug("Tokenizing input...")
+            # A single text needs no padding
             inputs = self.tokenizer(
                 text, 
                 return_tensors='pt', 
-                padding=True, 
+                padding=False, 
                 truncation=True,
-                max_length=512
+                max_length=self.max_length
             )
             
-            logger.debug(f"Tokenizer output shapes:")
-            logger.debug(f"  input_ids: {inputs['input_ids'].shape}")
-            logger.debug(f"  attention_mask: {inputs['attention_mask'].shape}")
+            logger.debug("Tokenizer output shapes: input_ids=%s attention_mask=%s", inputs['input_ids'].shape, inputs['attention_mask'].shape)
 
-            # Safety check: ensure no token id exceeds embedding size
-            try:
-                num_embeddings = self.model.bert.get_input_embeddings().num_embeddings  # type: ignore[attr-defined]
-                max_token_id = int(inputs['input_ids'].max().item())
-                if max_token_id >= num_embeddings:
-                    logger.error(f"Token id {max_token_id} >= embedding size {num_embeddings}. Vocab/embedding mismatch.")
-                    raise IndexError(f"Token id {max_token_id} out of range for embeddings of size {num_embeddings}")
-            except Exception as _emb_chk_err:
-                # If model is fallback or check not applicable, continue
-                logger.debug(f"Embedding size check info: {_emb_chk_err}")
+            # Safety check: ensure no token id exceeds embedding size (only needed on a vocab mismatch)
+            if not self._skip_embed_check:
+                try:
+                    num_embeddings = self.num_embeddings
+                    max_token_id = int(inputs['input_ids'].max().item())
+                    if max_token_id >= num_embeddings:
+                        logger.error(f"Token id {max_token_id} >= embedding size {num_embeddings}. Vocab/embedding mismatch.")
+                        raise IndexError(f"Token id {max_token_id} out of range for embeddings of size {num_embeddings}")
+                except Exception as _emb_chk_err:
+                    # If model is fallback or check not applicable, continue
+                    logger.debug("Embedding size check info: %s", _emb_chk_err)
 
             # Move to device
-            logger.debug(f"Moving inputs to device: {self.device}")
-            inputs = {k: v.to(self.device) for k, v in inputs.items()}
+            logger.debug("Moving inputs to device: %s", self.device)
+            inputs = self._inputs_to_device(inputs)
 
             # Get predictions
             logger.debug("Running model inference...")
-            with torch.no_grad():
+            with torch.inference_mode():
                 try:
-                    outputs = self.model(inputs['input_ids'], inputs['attention_mask'])
+                    outputs = self._forward(inputs['input_ids'], inputs['attention_mask'])
                     logger.debug("Model inference completed")
 
                     # Get logits
                     speaker_logits = outputs['speaker_logits']
                     sentiment_logits = outputs['sentiment_logits']
                     
-                    logger.debug(f"Speaker logits shape: {speaker_logits.shape}")
-                    logger.debug(f"Sentiment logits shape: {sentiment_logits.shape}")
+                    logger.debug("Speaker logits shape: %s", speaker_logits.shape)
+                    logger.debug("Sentiment logits shape: %s", sentiment_logits.shape)
+                    
+                    # Softmax is monotonic, so the predicted class is the argmax of the logits;
+                    # the probabilities are only needed for the confidence of that class
                     
                     # Speaker prediction
-                    speaker_probs = torch.softmax(speaker_logits, dim=-1)
-                    speaker_pred = torch.argmax(speaker_probs, dim=-1)
-                    speaker_confidence = torch.max(speaker_probs).item()
+                    speaker_pred = speaker_logits.argmax(-1)
+                    speaker_confidence = torch.softmax(speaker_logits, -1).gather(-1, speaker_pred.unsqueeze(-1)).squeeze(-1)
                     
                     # Sentiment prediction
-                    sentiment_probs = torch.softmax(sentiment_logits, dim=-1)
-                    sentiment_pred = torch.argmax(sentiment_probs, dim=-1)
-                    sentiment_confidence = torch.max(sentiment_probs).item()
+                    sentiment_pred = sentiment_logits.argmax(-1)
+                    sentiment_confidence = torch.softmax(sentiment_logits, -1).gather(-1, sentiment_pred.unsqueeze(-1)).squeeze(-1)
+                    
+                    # Pull indices and confidences to the host in a single copy (one sync instead of one per .item())
+                    speaker_idx, sentiment_idx, speaker_confidence, sentiment_confidence = torch.stack([
+                        speaker_pred.float(), sentiment_pred.float(), speaker_confidence.float(), sentiment_confidence.float()
+                    ]).flatten().cpu().tolist()
+                    speaker_idx = int(speaker_idx)
+                    sentiment_idx = int(sentiment_idx)
                     
                     # Validate indices
-                    if speaker_pred.item() >= len(self.speaker_labels):
-                        logger.error(f"Speaker prediction index {speaker_pred.item()} out of range for labels {self.speaker_labels}")
-                        raise IndexError(f"Speaker prediction index {speaker_pred.item()} >= {len(self.speaker_labels)}")
+                    if speaker_idx >= len(self.speaker_labels):
+                        logger.error(f"Speaker prediction index {speaker_idx} out of range for labels {self.speaker_labels}")
+                        raise IndexError(f"Speaker prediction index {speaker_idx} >= {len(self.speaker_labels)}")
                     
-                    if sentiment_pred.item() >= len(self.sentiment_labels):
-                        logger.error(f"Sentiment prediction index {sentiment_pred.item()} out of range for labels {self.sentiment_labels}")
-                        raise IndexError(f"Sentiment prediction index {sentiment_pred.item()} >= {len(self.sentiment_labels)}")
+                    if sentiment_idx >= len(self.sentiment_labels):
+                        logger.error(f"Sentiment prediction index {sentiment_idx} out of range for labels {self.sentiment_labels}")
+                        raise IndexError(f"Sentiment prediction index {sentiment_idx} >= {len(self.sentiment_labels)}")
                     
                     result = {
-                        'speaker': self.speaker_labels[speaker_pred.item()].lower(),
-                        'sentiment': self.sentiment_labels[sentiment_pred.item()].lower(),
+                        'speaker': self._speaker_labels_lower[speaker_idx],
+                        'sentiment': self._sentiment_labels_lower[sentiment_idx],
                         'speaker_confidence': speaker_confidence,
                         'sentiment_confidence': sentiment_confidence
                     }
                     
-                    logger.debug(f"Analysis result: {result}")
+                    logger.debug("Analysis result: %s", result)
                     return result
                     
                 except Exception as model_error:
                     logger.error(f"Error during model inference: {str(model_error)}")
                     logger.error(f"Model inference error type: {type(model_error).__name__}")
-                    import traceback
                     logger.error(f"Model inference traceback: {traceback.format_exc()}")
                     raise model_error
                 
         except Exception as e:
             logger.error(f"Error analyzing text: {str(e)}")
             logger.error(f"Error type: {type(e).__name__}")
-            import traceback
             logger.error(f"Full traceback: {traceback.format_exc()}")
             
             # Check if we should fall back to simple model
@@ -394,13 +675,105 @@ class TherapeuticModelService:
         if not self.is_available():
             return [{'speaker': 'unknown', 'sentiment': 'neutral'} for _ in texts]
         
-        results = []
-        for text in texts:
-            result = self.analyze_text(text)
-            results.append(result)
+        # The rule-based fallback has no batched path
+        if isinstance(self.model, SimpleTherapeuticModel):
+            return [self.analyze_text(text) for text in texts]
         
-        return results
-
+        columns = self.batch_analyze_soa(texts)
+        return [
+            {'speaker': speaker, 'sentiment': sentiment, 'speaker_confidence': s_conf, 'sentiment_confidence': se_conf}
+            for speaker, sentiment, s_conf, se_conf in zip(
+                columns['speaker'].tolist(),
+                columns['sentiment'].tolist(),
+                columns['speaker_confidence'].tolist(),
+                columns['sentiment_confidence'].tolist()
+            )
+        ]
+    
+    def batch_analyze_soa(self, texts):
+        """
+        Analyze multiple texts in one batch, returning one array per result field
+        
+        Args:
+            texts (list): List of texts to analyze
+            
+        Returns:
+            dict: 'speaker' and 'sentiment' label arrays and float32 'speaker_confidence' and
+                  'sentiment_confidence' arrays, one entry per text
+        """
+        # Unavailable or rule-based models have no batched path
+        if not self.is_available() or isinstance(self.model, SimpleTherapeuticModel):
+            return self._columns_from_results([self.analyze_text(text) for text in texts])
+        
+        # Label lookup tables, with analyze_text's default label as the extra last entry
+        speaker_names = np.array([*self._speaker_labels_lower, 'unknown'])
+        sentiment_names = np.array([*self._sentiment_labels_lower, 'neutral'])
+        
+        # Empty texts keep analyze_text's default result; the rest share one tokenizer call and one forward pass
+        speaker_idx = np.full(len(texts), len(self.speaker_labels))
+        sentiment_idx = np.full(len(texts), len(self.sentiment_labels))
+        speaker_conf = np.zeros(len(texts), dtype=np.float32)
+        sentiment_conf = np.zeros(len(texts), dtype=np.float32)
+        indices = [i for i, text in enumerate(texts) if text and text.strip()]
+        
+        if indices:
+            try:
+                inputs = self.tokenizer(
+                    [texts[i] for i in indices],
+                    return_tensors='pt',
+                    padding='longest',
+                    truncation=True,
+                    max_length=self.max_length
+                )
+                
+                # Same safety check as analyze_text: every token id must exist in the embedding table
+                if not self._skip_embed_check:
+                    max_token_id = int(inputs['input_ids'].max().item())
+                    if max_token_id >= self.num_embeddings:
+                        raise IndexError(f"Token id {max_token_id} out of range for embeddings of size {self.num_embeddings}")
+                
+                input_ids = inputs['input_ids'].to(self.device, _INPUT_DTYPE, non_blocking=True)
+                attention_mask = inputs['attention_mask'].to(self.device, _INPUT_DTYPE, non_blocking=True)
+                
+                with torch.inference_mode():
+                    outputs = self._forward(input_ids, attention_mask)
+                    
+                    # Argmax of the logits (softmax is monotonic); softmax only for the chosen class's confidence
+                    batch_speaker_idx = outputs['speaker_logits'].argmax(-1)
+                    batch_speaker_conf = torch.softmax(outputs['speaker_logits'], dim=-1).gather(1, batch_speaker_idx[:, None]).squeeze(1)
+                    
+                    batch_sentiment_idx = outputs['sentiment_logits'].argmax(-1)
+                    batch_sentiment_conf = torch.softmax(outputs['sentiment_logits'], dim=-1).gather(1, batch_sentiment_idx[:, None]).squeeze(1)
+                    
+                    # One device->host copy for all four result columns
+                    packed = torch.stack([
+                        batch_speaker_idx.float(), batch_sentiment_idx.float(), batch_speaker_conf.float(), batch_sentiment_conf.float()
+                    ]).cpu().numpy()
+                
+                speaker_idx[indices] = packed[0]
+                sentiment_idx[indices] = packed[1]
+                speaker_conf[indices] = packed[2]
+                sentiment_conf[indices] = packed[3]
+            except Exception as e:
+                logger.error(f"Error in batch analysis, analyzing texts one by one: {str(e)}")
+                return self._columns_from_results([self.analyze_text(text) for text in texts])
+        
+        return {
+            'speaker': speaker_names[speaker_idx],
+            'sentiment': sentiment_names[sentiment_idx],
+            'speaker_confidence': speaker_conf,
+            'sentiment_confidence': sentiment_conf
+        }
+    
+    @staticmethod
+    def _columns_from_results(results):
+        """Turn per-text analyze_text results into batch_analyze_soa's column arrays"""
+        return {
+            'speaker': np.array([result['speaker'] for result in results], dtype=str),
+            'sentiment': np.array([result['sentiment'] for result in results], dtype=str),
+            'speaker_confidence': np.array([result['speaker_confidence'] for result in results], dtype=np.float32),
+            'sentiment_confidence': np.array([result['sentiment_confidence'] for result in results], dtype=np.float32)
+        }
 
 class SimpleTherapeuticModel:
     """Simple fallback model for basic speaker and sentiment analysis"""
@@ -416,28 +789,50 @@ class SimpleTherapeuticModel:
             'negative': ['bad', 'sad', 'angry', 'worse', 'problem', 'difficult', 'hate', 'fear'],
             'mixed': ['but', 'however', 'although', 'mixed feelings', 'conflicted']
         }
+        
+        # With pyahocorasick, one automaton over all keywords finds every match in a single pass;
+        # each keyword maps to the (category, label) scores it adds to
+        self._automaton = None
+        if AHOCORASICK_AVAILABLE:
+            targets = {}
+            for category, keywords_by_label in (('speaker', self.speaker_keywords), ('sentiment', self.sentiment_keywords)):
+                for label, keywords in keywords_by_label.items():
+                    for keyword in keywords:
+                        targets.setdefault(keyword, []).append((category, label))
+            self._automaton = ahocorasick.Automaton()
+            for keyword, keyword_targets in targets.items():
+                self._automaton.add_word(keyword, (keyword, tuple(keyword_targets)))
+            self._automaton.make_automaton()
     
     def analyze_text(self, text):
         """Simple rule-based analysis"""
         text_lower = text.lower()
         
-        # Speaker identification
         speaker_scores = {'client': 0, 'therapist': 0}
-        for speaker, keywords in self.speaker_keywords.items():
-            for keyword in keywords:
-                if keyword in text_lower:
-                    speaker_scores[speaker] += 1
+        sentiment_scores = {'positive': 0, 'negative': 0, 'mixed': 0, 'neutral': 1}
         
+        if self._automaton is not None:
+            # Each keyword present counts once, however often it occurs (like the substring checks)
+            scores = {'speaker': speaker_scores, 'sentiment': sentiment_scores}
+            for _, keyword_targets in {value for _, value in self._automaton.iter(text_lower)}:
+                for category, label in keyword_targets:
+                    scores[category][label] += 1
+        else:
+            for speaker, keywords in self.speaker_keywords.items():
+                for keyword in keywords:
+                    if keyword in text_lower:
+                        speaker_scores[speaker] += 1
+            
+            for sentiment, keywords in self.sentiment_keywords.items():
+                for keyword in keywords:
+                    if keyword in text_lower:
+                        sentiment_scores[sentiment] += 1
+        
+        # Speaker identification
         speaker = max(speaker_scores, key=speaker_scores.get) if max(speaker_scores.values()) > 0 else 'unknown'
         speaker_confidence = max(speaker_scores.values()) / (sum(speaker_scores.values()) + 1)
         
         # Sentiment analysis
-        sentiment_scores = {'positive': 0, 'negative': 0, 'mixed': 0, 'neutral': 1}
-        for sentiment, keywords in self.sentiment_keywords.items():
-            for keyword in keywords:
-                if keyword in text_lower:
-                    sentiment_scores[sentiment] += 1
-        
         sentiment = max(sentiment_scores, key=sentiment_scores.get)
         sentiment_confidence = max(sentiment_scores.values()) / (sum(sentiment_scores.values()) + 1)
         
@@ -5,10 +5,23 @@ Encoding section - Custom coding schemes and paragraph categorization
 from nicegui import ui, events
 from ..theme import get_button_class
 from ...app_state import CodingScheme
+import codecs
 import csv
-import io
 import uuid
 
+# Decodes the binary CSV upload incrementally
+_UTF8_READER = codecs.getreader('utf-8')
+
+# The paragraph list is virtualized: only a window of cards around the viewport is rendered,
+# and spacer elements sized from the fixed card height stand in for the rest
+_PARAGRAPH_VIEWPORT_HEIGHT = 600  # px
+_PARAGRAPH_CARD_HEIGHT = 134  # px per card, including the gap
+_PARAGRAPH_CARD_GAP = 8  # px between cards (the container's gap-2)
+_PARAGRAPH_TEXT_LINES = 3  # paragraph text is clamped to this many lines so every card has the same height
+_PARAGRAPH_DIALOG_TEXT_HEIGHT = 240  # px; the coding dialog shows the full text, scrolling beyond this
+_PARAGRAPH_WINDOW_SIZE = 40  # cards rendered at a time
+_PARAGRAPH_WINDOW_STEP = 10  # the window moves in steps of this many paragraphs
+
 
 class EncodingSection:
     """Encoding section for custom coding schemes and categorization"""
@@ -18,6 +31,16 @@ class EncodingSection:
         self.scheme_table = None
         self.paragraph_container = None
         self.coding_tree_container = None
+        self._paragraph_top_spacer = None
+        self._paragraph_bottom_spacer = None
+        self._paragraph_window_start = 0
+        # Coding tree widgets kept across refreshes, keyed by scheme id
+        self._tree_expansions = {}
+        self._tree_status_labels = []
+        # Badge rows of the rendered paragraph cards, keyed by paragraph id
+        self._paragraph_badge_rows = {}
+        # (paragraph id, length) -> (text, preview) for the shortened paragraph texts
+        self._preview_cache = {}
         
     def create(self):
         """Create the encoding section UI"""
@@ -68,6 +91,16 @@ class EncodingSection:
                 row_key='id'
             ).classes('coding-table w-full')
             
+            # Add action buttons
+            self.scheme_table.add_slot('body-cell-actions', '''
+                <q-td :props="props">
+                    <q-btn size="sm" color="negative" icon="delete" @click="$parent.$emit('delete', props.row.id)" />
+                </q-td>
+            ''')
+            
+            # Handle delete action
+            self.scheme_table.on('delete', self._delete_coding_scheme)
+            
             self._update_scheme_table()
     
     def _create_paragraph_coding_section(self):
@@ -78,8 +111,21 @@ class EncodingSection:
                 'Click on paragraphs to assign codes from your coding scheme'
             ).classes('text-body2 text-grey-6')
             
-            # Container for paragraphs
-            self.paragraph_container = ui.column().classes('w-full gap-2')
+            # Scrollable viewport: spacers reserve the height of the paragraphs outside the window
+            with ui.scroll_area(on_scroll=self._on_paragraph_scroll).classes('w-full').style(
+                f'height: {_PARAGRAPH_VIEWPORT_HEIGHT}px'
+            ):
+                self._paragraph_top_spacer = ui.element('div')
+                # A single delegated click listener: the card under the click reports its data-pid
+                self.paragraph_container = ui.column().classes('w-full gap-2').on(
+                    'click',
+                    self._on_paragraph_click,
+                    js_handler='''(event) => {
+                        const card = event.target.closest('[data-pid]');
+                        if (card) emit({pid: Number(card.dataset.pid)});
+                    }''',
+                )
+                self._paragraph_bottom_spacer = ui.element('div')
     
     def _create_coding_storage_section(self):
         """Create coding storage tree view"""
@@ -104,7 +150,7 @@ class EncodingSection:
             title_input = ui.input('Title', placeholder='e.g., Positive Emotion').classes('w-full')
             keywords_input = ui.textarea(
                 'Keywords (one per line)', 
-                placeholder='happy\\njoyful\\noptimistic'
+                placeholder='happy\njoyful\noptimistic'
             ).classes('w-full').props('rows=4')
             
             with ui.row().classes('w-full justify-end gap-2 q-mt-md'):
@@ -125,19 +171,19 @@ class EncodingSection:
             return
         
         # Check if ID already exists
-        if any(scheme.id == code_id for scheme in self.app_state.coding_schemes):
+        if self.app_state.has_coding_scheme(code_id):
             ui.notify('Code ID already exists', type='warning')
             return
         
         # Parse keywords
-        keywords = [k.strip() for k in keywords_text.split('\\n') if k.strip()] if keywords_text else []
+        keywords = [k.strip() for k in keywords_text.splitlines() if k.strip()] if keywords_text else []
         
         # Create and add scheme
         scheme = CodingScheme(id=code_id, title=title, keywords=keywords)
         self.app_state.add_coding_scheme(scheme)
         
         # Update UI
-        self._update_scheme_table()
+        self._add_scheme_row(scheme)
         self._update_coding_tree()
         
         dialog.close()
@@ -146,22 +192,36 @@ class EncodingSection:
     def _handle_csv_upload(self, event: events.UploadEventArguments):
         """Handle CSV upload for coding schemes"""
         try:
-            content = event.content.read().decode('utf-8')
-            csv_reader = csv.DictReader(io.StringIO(content))
+            # Decode and parse the upload row by row instead of reading it into one string first
+            # (a StreamReader neither closes the upload file when collected nor needs it to be readable())
+            csv_reader = csv.reader(_UTF8_READER(event.content))
             
-            added_count = 0
-            for row in csv_reader:
-                if 'ID' in row and 'Title' in row:
-                    code_id = row['ID'].strip()
-                    title = row['Title'].strip()
-                    keywords = [k.strip() for k in row.get('Keywords', '').split(',') if k.strip()]
+            # Only ID, Title and Keywords are used, so rows are read as plain lists indexed by header position
+            header = next(csv_reader, [])
+            new_schemes = []
+            new_ids = set()
+            if 'ID' in header and 'Title' in header:
+                idx_id = header.index('ID')
+                idx_title = header.index('Title')
+                idx_keywords = header.index('Keywords') if 'Keywords' in header else -1
+                min_length = max(idx_id, idx_title) + 1
+                
+                for row in csv_reader:
+                    if len(row) < min_length:
+                        continue
+                    code_id = row[idx_id].strip()
+                    title = row[idx_title].strip()
+                    keywords_text = row[idx_keywords] if 0 <= idx_keywords < len(row) else ''
+                    keywords = [k.strip() for k in keywords_text.split(',') if k.strip()]
                     
-                    # Check if ID already exists
-                    if not any(scheme.id == code_id for scheme in self.app_state.coding_schemes):
-                        scheme = CodingScheme(id=code_id, title=title, keywords=keywords)
-                        self.app_state.add_coding_scheme(scheme)
-                        added_count += 1
+                    # Check if ID already exists, in the state or earlier in this file
+                    if code_id not in new_ids and not self.app_state.has_coding_scheme(code_id):
+                        new_schemes.append(CodingScheme(id=code_id, title=title, keywords=keywords))
+                        new_ids.add(code_id)
             
+            # Add the whole file at once, then refresh the table and tree once
+            self.app_state.add_coding_schemes(new_schemes)
+            added_count = len(new_schemes)
             if added_count > 0:
                 self._update_scheme_table()
                 self._update_coding_tree()
@@ -174,32 +234,32 @@ class EncodingSection:
     
     def _update_scheme_table(self):
         """Update the coding scheme table"""
-        rows = []
-        for scheme in self.app_state.coding_schemes:
-            rows.append({
-                'id': scheme.id,
-                'title': scheme.title,
-                'keywords': ', '.join(scheme.keywords[:3]) + ('...' if len(scheme.keywords) > 3 else ''),
-                'actions': scheme.id
-            })
-        
-        self.scheme_table.rows = rows
-        
-        # Add action buttons
-        self.scheme_table.add_slot('body-cell-actions', '''
-            <q-td :props="props">
-                <q-btn size="sm" color="negative" icon="delete" @click="$parent.$emit('delete', props.row.id)" />
-            </q-td>
-        ''')
-        
-        # Handle delete action
-        self.scheme_table.on('delete', self._delete_coding_scheme)
+        self.scheme_table.rows = [self._scheme_row(scheme) for scheme in self.app_state.coding_schemes]
+    
+    def _scheme_row(self, scheme):
+        """Build the table row for a coding scheme"""
+        return {
+            'id': scheme.id,
+            'title': scheme.title,
+            'keywords': scheme.display_keywords,
+            'actions': scheme.id
+        }
+    
+    def _add_scheme_row(self, scheme):
+        """Append a single coding scheme to the table"""
+        self.scheme_table.rows.append(self._scheme_row(scheme))
+        self.scheme_table.update()
+    
+    def _remove_scheme_row(self, scheme_id):
+        """Remove a single coding scheme from the table"""
+        self.scheme_table.rows = [row for row in self.scheme_table.rows if row['id'] != scheme_id]
+        self.scheme_table.update()
     
     def _delete_coding_scheme(self, event):
         """Delete a coding scheme"""
         scheme_id = event.args
         self.app_state.remove_coding_scheme(scheme_id)
-        self._update_scheme_table()
+        self._remove_scheme_row(scheme_id)
         self._update_coding_tree()
         ui.notify(f'Deleted coding scheme: {scheme_id}', type='info')
     
@@ -207,27 +267,75 @@ class EncodingSection:
         """Update paragraph display for coding"""
         if not self.paragraph_container:
             return
-            
+        
+        # Keep the current scroll window unless the transcript got shorter than it
+        start = self._paragraph_window_start
+        if start >= len(self.app_state.paragraphs):
+            start = 0
+        self._render_paragraph_window(start)
+    
+    def _on_paragraph_scroll(self, event: events.ScrollEventArguments):
+        """Move the rendered paragraph window along with the scroll position"""
+        first_visible = int(event.vertical_position // _PARAGRAPH_CARD_HEIGHT)
+        # One step of cards is kept above the viewport; the window only moves a whole step at a time
+        start = max(0, (first_visible // _PARAGRAPH_WINDOW_STEP - 1) * _PARAGRAPH_WINDOW_STEP)
+        if start != self._paragraph_window_start:
+            self._render_paragraph_window(start)
+    
+    def _render_paragraph_window(self, start):
+        """Render the paragraph cards from start to start + _PARAGRAPH_WINDOW_SIZE"""
+        paragraphs = self.app_state.paragraphs
+        end = min(len(paragraphs), start + _PARAGRAPH_WINDOW_SIZE)
+        self._paragraph_window_start = start
+        
+        self._paragraph_top_spacer.style(f'height: {start * _PARAGRAPH_CARD_HEIGHT}px')
+        self._paragraph_bottom_spacer.style(f'height: {(len(paragraphs) - end) * _PARAGRAPH_CARD_HEIGHT}px')
+        
         self.paragraph_container.clear()
+        self._paragraph_badge_rows = {}
         
         with self.paragraph_container:
-            if not self.app_state.paragraphs:
+            if not paragraphs:
                 ui.label('No transcript loaded. Please upload a transcript in the Home section.').classes('text-body2 text-grey-6 text-center p-4')
                 return
             
-            for paragraph in self.app_state.paragraphs:
-                with ui.card().classes('paragraph cursor-pointer').on('click', 
-                    lambda p=paragraph: self._show_coding_menu(p)):
-                    
-                    with ui.row().classes('w-full items-center gap-2'):
-                        ui.label(f'Paragraph {paragraph.id + 1}').classes('text-caption text-grey-6')
-                        ui.space()
-                        
-                        # Show assigned codes as badges
-                        for code in paragraph.codes:
-                            ui.badge(code).classes('code-badge')
-                    
-                    ui.label(paragraph.text).classes('text-body2 q-mt-sm')
+            for paragraph in paragraphs[start:end]:
+                self._create_paragraph_card(paragraph)
+    
+    def _create_paragraph_card(self, paragraph):
+        """Create the card for one paragraph in the coding list"""
+        card_style = f'height: {_PARAGRAPH_CARD_HEIGHT - _PARAGRAPH_CARD_GAP}px; flex-shrink: 0'
+        with ui.card().classes('paragraph cursor-pointer overflow-hidden').props(f'data-pid={paragraph.id}').style(card_style):
+            
+            with ui.row().classes('w-full items-center gap-2 no-wrap'):
+                ui.label(f'Paragraph {paragraph.id + 1}').classes('text-caption text-grey-6')
+                ui.space()
+                
+                # Show assigned codes as badges
+                self._paragraph_badge_rows[paragraph.id] = ui.row().classes('items-center gap-2')
+                self._update_paragraph_badges(paragraph)
+            
+            ui.label(paragraph.text).classes('text-body2 q-mt-sm').style(
+                f'display: -webkit-box; -webkit-box-orient: vertical; -webkit-line-clamp: {_PARAGRAPH_TEXT_LINES}; '
+                'overflow: hidden'
+            )
+    
+    def _update_paragraph_badges(self, paragraph):
+        """Redraw the code badges of a rendered paragraph card"""
+        badge_row = self._paragraph_badge_rows.get(paragraph.id)
+        if badge_row is None:
+            return
+        
+        badge_row.clear()
+        with badge_row:
+            for code in sorted(paragraph.codes):
+                ui.badge(code).classes('code-badge')
+    
+    def _on_paragraph_click(self, event):
+        """Open the coding menu for the paragraph card that was clicked"""
+        paragraph_id = event.args['pid']
+        if 0 <= paragraph_id < len(self.app_state.paragraphs):
+            self._show_coding_menu(self.app_state.paragraphs[paragraph_id])
     
     def _show_coding_menu(self, paragraph):
         """Show coding menu for paragraph"""
@@ -238,32 +346,34 @@ class EncodingSection:
         with ui.dialog() as dialog, ui.card().classes('w-96'):
             ui.label(f'Code Paragraph {paragraph.id + 1}').classes('text-h6 q-mb-md')
             
-            # Paragraph preview
-            preview_text = paragraph.text[:150] + '...' if len(paragraph.text) > 150 else paragraph.text
-            ui.label(preview_text).classes('text-body2 text-grey-6 q-mb-md bg-grey-1 p-2 rounded')
+            # Full paragraph text (the list cards clamp it to a few lines), scrollable when long
+            ui.label(paragraph.text).classes('text-body2 text-grey-6 q-mb-md bg-grey-1 p-2 rounded w-full').style(
+                f'max-height: {_PARAGRAPH_DIALOG_TEXT_HEIGHT}px; overflow-y: auto; white-space: pre-wrap'
+            )
             
             # Current codes
             if paragraph.codes:
                 ui.label('Current codes:').classes('text-body2 font-bold')
                 with ui.row().classes('gap-1 q-mb-md'):
-                    for code in paragraph.codes:
+                    for code in sorted(paragraph.codes):
                         ui.badge(code).classes('code-badge')
             
             # Available codes
             ui.label('Available codes:').classes('text-body2 font-bold')
+            # One change handler for every checkbox, which looks up the code by checkbox id
+            checkbox_codes = {}
+            on_change = lambda e: self._toggle_paragraph_code(paragraph, checkbox_codes[e.sender.id], e.value)
             with ui.column().classes('gap-1 max-h-64 overflow-auto'):
                 for scheme in self.app_state.coding_schemes:
                     is_assigned = scheme.id in paragraph.codes
                     
                     with ui.row().classes('items-center gap-2 w-full'):
-                        ui.checkbox(
-                            value=is_assigned,
-                            on_change=lambda e, s=scheme: self._toggle_paragraph_code(paragraph, s.id, e.value)
-                        )
+                        checkbox = ui.checkbox(value=is_assigned, on_change=on_change)
+                        checkbox_codes[checkbox.id] = scheme.id
                         with ui.column().classes('flex-1'):
                             ui.label(f'{scheme.id}: {scheme.title}').classes('text-body2')
                             if scheme.keywords:
-                                ui.label(f'Keywords: {", ".join(scheme.keywords[:3])}').classes('text-caption text-grey-6')
+                                ui.label(f'Keywords: {scheme.keyword_preview}').classes('text-caption text-grey-6')
             
             with ui.row().classes('w-full justify-end q-mt-md'):
                 ui.button('Done', on_click=dialog.close).classes(get_button_class('primary'))
@@ -277,50 +387,142 @@ class EncodingSection:
         else:
             self.app_state.remove_paragraph_code(paragraph.id, code_id)
         
-        self._update_paragraph_display()
-        self._update_coding_tree()
+        # Only this paragraph's badges and its cards in the coding tree change
+        self._update_paragraph_badges(paragraph)
+        entry = self._tree_expansions.get(code_id)
+        if entry is not None:
+            entry['expansion'].text = self._tree_header(entry['scheme'])
+        for code in paragraph.codes | {code_id}:
+            self._update_tree_card(code, paragraph)
+        self._update_tree_status()
     
     def _update_coding_tree(self):
         """Update the coding storage tree"""
         if not hasattr(self, 'coding_tree_container'):
             return
-            
-        # Clear existing content
-        self.coding_tree_container.clear()
         
+        schemes = self.app_state.coding_schemes
+        
+        # Drop the expansions of deleted schemes; the rest are reused
+        scheme_ids = {scheme.id for scheme in schemes}
+        for scheme_id in [scheme_id for scheme_id in self._tree_expansions if scheme_id not in scheme_ids]:
+            self._tree_expansions.pop(scheme_id)['expansion'].delete()
+        
+        with self.coding_tree_container:
+            # One expansion header per scheme; its paragraph cards are only built once it is opened
+            for scheme in schemes:
+                entry = self._tree_expansions.get(scheme.id)
+                if entry is None:
+                    entry = {'scheme': scheme, 'built': False, 'cards': {}}
+                    entry['expansion'] = ui.expansion(
+                        self._tree_header(scheme),
+                        on_value_change=lambda e, s=scheme, en=entry: self._on_tree_expansion_change(s, en, e.value)
+                    ).classes('w-full')
+                    with entry['expansion']:
+                        entry['body'] = ui.column().classes('gap-1 pl-4')
+                    self._tree_expansions[scheme.id] = entry
+                else:
+                    # Existing expansion: refresh its header and let its body be rebuilt
+                    entry['scheme'] = scheme
+                    entry['expansion'].text = self._tree_header(scheme)
+                    entry['body'].clear()
+                    entry['built'] = False
+                    if entry['expansion'].value:
+                        self._build_tree_body(scheme, entry)
+        
+        self._update_tree_status()
+    
+    def _tree_header(self, scheme):
+        """Expansion header for a scheme in the coding tree"""
+        return f'{scheme.id}: {scheme.title} ({len(self.app_state.paragraphs_for_code(scheme.id))} paragraphs)'
+    
+    def _update_tree_status(self):
+        """Show the coding tree's status message, if any, below the schemes"""
+        for label in self._tree_status_labels:
+            label.delete()
+        self._tree_status_labels = []
+        
+        if not self._tree_expansions:
+            message = 'No coding schemes available'
+        elif not self.app_state.has_coded_paragraphs():
+            message = 'No coded paragraphs yet. Start coding paragraphs to see them organized here.'
+        else:
+            return
         with self.coding_tree_container:
-            if not self.app_state.coding_schemes:
-                ui.label('No coding schemes available').classes('text-body2 text-grey-6 text-center p-4')
+            self._tree_status_labels.append(ui.label(message).classes('text-body2 text-grey-6 text-center p-4'))
+    
+    def _on_tree_expansion_change(self, scheme, entry, is_open):
+        """Build a scheme's paragraph cards the first time its expansion is opened"""
+        if is_open and not entry['built']:
+            self._build_tree_body(scheme, entry)
+    
+    def _build_tree_body(self, scheme, entry):
+        """Build the paragraph cards inside a scheme's expansion"""
+        coded_paragraphs = self.app_state.paragraphs_for_code(scheme.id)
+        entry['built'] = True
+        entry['cards'] = {}
+        
+        with entry['body']:
+            if not coded_paragraphs:
+                # Show scheme even if no paragraphs are coded
+                ui.label('No paragraphs coded with this scheme yet').classes('text-body2 text-grey-6 p-2')
                 return
             
-            # Create expandable tree structure using cards and nested elements
-            for scheme in self.app_state.coding_schemes:
-                # Get paragraphs with this code
-                coded_paragraphs = [p for p in self.app_state.paragraphs if scheme.id in p.codes]
-                
-                if coded_paragraphs:
-                    with ui.expansion(f'{scheme.id}: {scheme.title} ({len(coded_paragraphs)} paragraphs)').classes('w-full'):
-                        with ui.column().classes('gap-1 pl-4'):
-                            for paragraph in coded_paragraphs:
-                                preview = paragraph.text[:80] + '...' if len(paragraph.text) > 80 else paragraph.text
-                                with ui.card().classes('p-2 bg-grey-1'):
-                                    ui.label(f'Paragraph {paragraph.id + 1}').classes('text-caption text-primary font-bold')
-                                    ui.label(preview).classes('text-body2')
-                                    
-                                    # Show other codes assigned to this paragraph
-                                    other_codes = [code for code in paragraph.codes if code != scheme.id]
-                                    if other_codes:
-                                        with ui.row().classes('gap-1 mt-1'):
-                                            ui.label('Also coded as:').classes('text-caption text-grey-6')
-                                            for code in other_codes:
-                                                ui.badge(code).classes('text-xs')
-                else:
-                    # Show scheme even if no paragraphs are coded
-                    with ui.expansion(f'{scheme.id}: {scheme.title} (0 paragraphs)').classes('w-full'):
-                        ui.label('No paragraphs coded with this scheme yet').classes('text-body2 text-grey-6 p-2')
+            for paragraph in coded_paragraphs:
+                entry['cards'][paragraph.id] = self._create_tree_card(scheme.id, paragraph)
+    
+    def _create_tree_card(self, scheme_id, paragraph):
+        """Create the card for a paragraph under a scheme in the coding tree"""
+        preview = self._preview(paragraph, 80)
+        with ui.card().classes('p-2 bg-grey-1') as card:
+            ui.label(f'Paragraph {paragraph.id + 1}').classes('text-caption text-primary font-bold')
+            ui.label(preview).classes('text-body2')
             
-            if not any(p.codes for p in self.app_state.paragraphs):
-                ui.label('No coded paragraphs yet. Start coding paragraphs to see them organized here.').classes('text-body2 text-grey-6 text-center p-4')
+            # Show other codes assigned to this paragraph
+            other_codes = sorted(code for code in paragraph.codes if code != scheme_id)
+            if other_codes:
+                with ui.row().classes('gap-1 mt-1'):
+                    ui.label('Also coded as:').classes('text-caption text-grey-6')
+                    for code in other_codes:
+                        ui.badge(code).classes('text-xs')
+        return card
+    
+    def _update_tree_card(self, scheme_id, paragraph):
+        """Add, redraw or remove a paragraph's card under one scheme of the coding tree"""
+        entry = self._tree_expansions.get(scheme_id)
+        if entry is None or not entry['built']:
+            return
+        
+        cards = entry['cards']
+        old_card = cards.pop(paragraph.id, None)
+        if old_card is not None:
+            old_card.delete()
+        
+        if scheme_id in paragraph.codes:
+            if not cards:
+                # Drop the "no paragraphs" message
+                entry['body'].clear()
+            with entry['body']:
+                card = self._create_tree_card(scheme_id, paragraph)
+            # Cards are kept in paragraph order
+            card.move(target_index=sum(1 for paragraph_id in cards if paragraph_id < paragraph.id))
+            cards[paragraph.id] = card
+        elif not cards:
+            with entry['body']:
+                ui.label('No paragraphs coded with this scheme yet').classes('text-body2 text-grey-6 p-2')
+    
+    def _preview(self, paragraph, length):
+        """Paragraph text shortened to length characters, cached until the text changes"""
+        key = (paragraph.id, length)
+        cached = self._preview_cache.get(key)
+        # Edits replace the text object, so an identity check is enough to spot a stale preview
+        if cached is not None and cached[0] is paragraph.text:
+            return cached[1]
+        
+        text = paragraph.text
+        preview = text[:length] + '...' if len(text) > length else text
+        self._preview_cache[key] = (text, preview)
+        return preview
     
     def refresh(self):
         """Refresh displays when section becomes active"""
@@ -3,11 +3,17 @@ Entities section - Entity detection and anonymization
 """
 
 from nicegui import ui
-from ...services.nlp_service import NLPService
+from ...services.nlp_service import NLPService, NLP_READY
 from ..theme import get_button_class, get_paragraph_class
 from ...app_state import Entity
 import asyncio
 
+# Maximum seconds to wait for background NLP initialization before using the regex fallback
+NLP_INIT_TIMEOUT = 120
+
+# Paragraphs sent to the NER pipeline per call (and per progress/UI refresh)
+NER_BATCH_SIZE = 16
+
 class EntitiesSection:
     """Entities section for entity detection and anonymization"""
     
@@ -122,11 +128,23 @@ class EntitiesSection:
         # Briefly yield so the dialog actually appears before heavy work
         await asyncio.sleep(0)
         
+        # NLP models load in the background at startup; wait for them if still loading
+        if not NLP_READY.is_set():
+            with client:
+                if self._progress_label:
+                    self._progress_label.text = 'Loading NLP models...'
+                if self._progress_bar:
+                    self._progress_bar.props('indeterminate')
+            await asyncio.to_thread(NLP_READY.wait, NLP_INIT_TIMEOUT)
+            with client:
+                if self._progress_bar:
+                    self._progress_bar.props(remove='indeterminate')
+        
         # Give the UI a chance to close dialogs/update before heavy work
         await asyncio.sleep(0)
         
         # Clear existing entities
-        self.app_state.entities = []
+        self.app_state.clear_entities()
         
         # Update UI to show empty state
         with client:
@@ -134,28 +152,29 @@ class EntitiesSection:
             self._update_paragraph_display()
         
         try:
-            # Process each paragraph with progress updates and UI refreshes
-            for i, paragraph in enumerate(self.app_state.paragraphs):
-                # Update progress UI every few paragraphs
-                if i % 3 == 0 or i == total_paragraphs - 1:
-                    with client:
-                        self._update_progress(i + 1, total_paragraphs)
+            # Process paragraphs in batches with progress updates and UI refreshes
+            paragraphs = self.app_state.paragraphs
+            for start in range(0, total_paragraphs, NER_BATCH_SIZE):
+                batch = paragraphs[start:start + NER_BATCH_SIZE]
                 
                 # Use Stanza-based extraction with regex fallback (run in thread to avoid blocking UI)
-                entities = await asyncio.to_thread(self.nlp_service.extract_entities, paragraph.text)
+                batch_entities = await asyncio.to_thread(
+                    self.nlp_service.extract_entities_batch, [p.text for p in batch], NER_BATCH_SIZE
+                )
                 
                 # Store paragraph reference for context
-                for entity in entities:
-                    entity.paragraph_id = paragraph.id
-                    self.app_state.entities.append(entity)
+                for paragraph, entities in zip(batch, batch_entities):
+                    for entity in entities:
+                        entity.paragraph_id = paragraph.id
+                        self.app_state.add_entity(entity)
                 
-                # Update UI every 5 paragraphs to show progress
-                if i % 5 == 0 or i == total_paragraphs - 1:
-                    with client:
-                        self._update_entity_table()
-                        self._update_paragraph_display()
-                    # Allow UI to update
-                    await asyncio.sleep(0.01)
+                # Update progress and UI after every batch
+                with client:
+                    self._update_progress(start + len(batch), total_paragraphs)
+                    self._update_entity_table()
+                    self._update_paragraph_display()
+                # Allow UI to update
+                await asyncio.sleep(0.01)
             
             # Final UI update
             with client:
@@ -176,11 +195,13 @@ class EntitiesSection:
 
     def _apply_anonymization(self):
         """Apply anonymization to the transcript"""
-        if not self.app_state.entities:
+        # One snapshot of the entities, gathered from every paragraph
+        entities = self.app_state.entities
+        if not entities:
             ui.notify('No entities detected. Run entity detection first.', type='warning')
             return
         
-        anonymized_entities = [e for e in self.app_state.entities if e.anonymized]
+        anonymized_entities = [e for e in entities if e.anonymized]
         if not anonymized_entities:
             ui.notify('No entities marked for anonymization', type='warning')
             return
@@ -192,7 +213,7 @@ class EntitiesSection:
             processed_paragraphs = 0
             for paragraph in self.app_state.paragraphs:
                 # Get entities for this paragraph
-                paragraph_entities = [e for e in anonymized_entities if hasattr(e, 'paragraph_id') and e.paragraph_id == paragraph.id]
+                paragraph_entities = [e for e in paragraph.entities if e.anonymized]
                 
                 if paragraph_entities:
                     processed_paragraphs += 1
@@ -202,11 +223,10 @@ class EntitiesSection:
                     paragraph.text = self.nlp_service.anonymize_text(paragraph.text, paragraph_entities)
             
             # Update current transcript
-            anonymized_paragraphs = [p.text for p in self.app_state.paragraphs]
-            self.app_state.current_transcript = '\n\n'.join(anonymized_paragraphs)
+            self.app_state.rebuild_transcript()
             
             # Clear entities after anonymization
-            self.app_state.entities = []
+            self.app_state.clear_entities()
             
             # Update displays
             self._update_paragraph_display()
@@ -243,8 +263,7 @@ class EntitiesSection:
         text = paragraph.text
         
         # Get entities for this paragraph
-        paragraph_entities = [e for e in self.app_state.entities 
-                            if hasattr(e, 'paragraph_id') and e.paragraph_id == paragraph.id]
+        paragraph_entities = list(paragraph.entities)
         
         if not paragraph_entities:
             return text
@@ -345,7 +364,7 @@ class EntitiesSection:
     def _edit_entity(self, event):
         """Edit entity replacement text"""
         entity_index = event.args['id']
-        entity = self.app_state.entities[entity_index]
+        entity = self.app_state.get_entity(entity_index)
         
         with ui.dialog() as dialog, ui.card().classes('w-96'):
             ui.label(f'Edit Entity: {entity.text}').classes('text-h6 q-mb-md')
@@ -379,7 +398,7 @@ class EntitiesSection:
     def _toggle_entity_anonymization(self, event):
         """Toggle entity anonymization status"""
         entity_index = event.args['id']
-        entity = self.app_state.entities[entity_index]
+        entity = self.app_state.get_entity(entity_index)
         
         entity.anonymized = not entity.anonymized
         self._update_entity_table()
@@ -390,22 +409,23 @@ class EntitiesSection:
     def _remove_entity(self, event):
         """Remove entity from list"""
         entity_index = event.args['id']
-        entity = self.app_state.entities[entity_index]
+        entity = self.app_state.get_entity(entity_index)
         
-        self.app_state.entities.pop(entity_index)
+        self.app_state.remove_entity(entity)
         self._update_entity_table()
         
         ui.notify(f'Removed entity "{entity.text}"', type='info')
 
     def _anonymize_all_entities(self):
         """Mark all entities for anonymization"""
-        for entity in self.app_state.entities:
+        entities = self.app_state.entities
+        for entity in entities:
             entity.anonymized = True
             if not entity.replacement:
                 entity.replacement = f'[{entity.entity_type}]'
         
         self._update_entity_table()
-        ui.notify(f'Marked {len(self.app_state.entities)} entities for anonymization', type='positive')
+        ui.notify(f'Marked {len(entities)} entities for anonymization', type='positive')
 
     def _clear_all_entities(self):
         """Clear all entity anonymization"""
@@ -429,7 +449,7 @@ class EntitiesSection:
         self._update_paragraph_display()
         
         if self.highlighted_entity_id is not None:
-            entity = self.app_state.entities[entity_index]
+            entity = self.app_state.get_entity(entity_index)
             ui.notify(f'Highlighted "{entity.text}" in transcript', type='info')
         else:
             ui.notify('Removed highlighting', type='info')
@@ -586,10 +606,7 @@ class EntitiesSection:
                 
                 # Check if this specific occurrence already exists
                 existing_occurrence = next(
-                    (e for e in self.app_state.entities 
-                     if hasattr(e, 'paragraph_id') 
-                     and e.paragraph_id == i 
-                     and e.start_pos == pos),
+                    (e for e in paragraph.entities if e.start_pos == pos),
                     None
                 )
                 
@@ -606,7 +623,7 @@ class EntitiesSection:
                     entity.auto_detected = False  # Mark as manual entity
                     entity.paragraph_id = i
                     
-                    self.app_state.entities.append(entity)
+                    self.app_state.add_entity(entity)
                     entities_created += 1
                 
                 # Move to next potential occurrence
@@ -623,7 +640,7 @@ class EntitiesSection:
                 replacement=replacement.strip() if replacement else f'[{entity_type}]'
             )
             entity.auto_detected = False  # Mark as manual entity
-            self.app_state.entities.append(entity)
+            self.app_state.add_entity(entity)
             ui.notify(f'Added general {entity_type} entity: "{entity_text_clean}" (not found in transcript)', type='info')
         else:
             ui.notify(f'Added {entities_created} {entity_type} entities for "{entity_text_clean}" found in transcript', type='positive')
@@ -650,12 +667,7 @@ class EntitiesSection:
         end_pos = start_pos + len(actual_text)
         
         # Check for duplicates
-        existing_entity = next(
-            (e for e in self.app_state.entities 
-             if hasattr(e, 'paragraph_id') 
-             and e.paragraph_id == paragraph_id),
-            None
-        )
+        existing_entity = next(iter(paragraph.entities), None)
         
         if existing_entity:
             ui.notify(f'Entity "{actual_text}" already exists in paragraph {paragraph_id + 1}', type='warning')
@@ -673,8 +685,8 @@ class EntitiesSection:
         entity.auto_detected = False  # Mark as manual entity
         entity.paragraph_id = paragraph_id
         
-        # Add to entities list
-        self.app_state.entities.append(entity)
+        # Add to the paragraph's entities
+        self.app_state.add_entity(entity)
         
         # Update displays
         self._update_entity_table()
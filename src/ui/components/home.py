@@ -75,18 +75,16 @@ class HomeSection:
         try:
             # Validate file extension
             file_name = event.name.lower()
-            if not any(file_name.endswith(ext) for ext in APP_CONFIG['allowed_extensions']):
+            if not file_name.endswith(APP_CONFIG['allowed_extensions']):
                 ui.notify(
                     f"Invalid file type. Only {', '.join(APP_CONFIG['allowed_extensions'])} files are allowed.",
                     type='negative'
                 )
                 return
             
-            # Read file content
-            content = event.content.read().decode('utf-8')
-            
-            # Load into app state
-            self.app_state.load_transcript(content, event.name)
+            # Stream file content into app state, detecting paragraphs as it is read
+            self.app_state.load_transcript_from_stream(event.content, event.name)
+            content = self.app_state.current_transcript
             
             # Update UI
             self.text_area.value = content
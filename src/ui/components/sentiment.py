@@ -92,10 +92,10 @@ class SentimentSection:
                 
                 # Use therapeutic model for sentiment analysis
                 result = self.therapeutic_model.analyze_text(paragraph.text)
-                paragraph.sentiment = result['sentiment']
+                self.app_state.update_paragraph_sentiment(paragraph.id, result['sentiment'])
                 
                 # Store confidence for potential future use
-                if not hasattr(paragraph, 'sentiment_confidence'):
+                if paragraph.sentiment_confidence is None:
                     paragraph.sentiment_confidence = result['sentiment_confidence']
             
             self.analysis_started = True
@@ -105,15 +105,12 @@ class SentimentSection:
             self._update_sentiment_summary()
             
             # Count sentiments
-            positive_count = sum(1 for p in self.app_state.paragraphs if p.sentiment == 'positive')
-            negative_count = sum(1 for p in self.app_state.paragraphs if p.sentiment == 'negative')
-            neutral_count = sum(1 for p in self.app_state.paragraphs if p.sentiment == 'neutral')
-            mixed_count = sum(1 for p in self.app_state.paragraphs if p.sentiment == 'mixed')
+            counts = self.app_state.get_sentiment_distribution()
             
             ui.notify(
                 f'✅ Sentiment analysis complete! '
-                f'Positive: {positive_count}, Negative: {negative_count}, '
-                f'Neutral: {neutral_count}, Mixed: {mixed_count}', 
+                f'Positive: {counts["positive"]}, Negative: {counts["negative"]}, '
+                f'Neutral: {counts["neutral"]}, Mixed: {counts["mixed"]}', 
                 type='positive'
             )
             
@@ -129,8 +126,7 @@ class SentimentSection:
         # Reset all paragraphs to neutral sentiment
         for paragraph in self.app_state.paragraphs:
             paragraph.sentiment = 'neutral'
-            if hasattr(paragraph, 'sentiment_confidence'):
-                delattr(paragraph, 'sentiment_confidence')
+            paragraph.sentiment_confidence = None
         
         self.analysis_started = False
         
@@ -168,7 +164,7 @@ class SentimentSection:
                         sentiment_badge.on('click', lambda p=paragraph: self._toggle_sentiment(p))
                         
                         # Show confidence if available
-                        if hasattr(paragraph, 'sentiment_confidence'):
+                        if paragraph.sentiment_confidence is not None:
                             confidence_pct = int(paragraph.sentiment_confidence * 100)
                             ui.label(f'({confidence_pct}%)').classes('text-caption text-grey-5')
                     
@@ -220,12 +216,7 @@ class SentimentSection:
                 return
             
             # Calculate sentiment counts
-            sentiment_counts = {
-                'positive': sum(1 for p in self.app_state.paragraphs if p.sentiment == 'positive'),
-                'negative': sum(1 for p in self.app_state.paragraphs if p.sentiment == 'negative'),
-                'neutral': sum(1 for p in self.app_state.paragraphs if p.sentiment == 'neutral'),
-                'mixed': sum(1 for p in self.app_state.paragraphs if p.sentiment == 'mixed')
-            }
+            sentiment_counts = self.app_state.get_sentiment_distribution()
             
             total_paragraphs = len(self.app_state.paragraphs)
             
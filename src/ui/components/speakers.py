@@ -82,23 +82,21 @@ class SpeakersSection:
                 
                 # Use therapeutic model for speaker identification
                 result = self.therapeutic_model.analyze_text(paragraph.text)
-                paragraph.speaker = result['speaker']
+                self.app_state.update_paragraph_speaker(paragraph.id, result['speaker'])
                 
                 # Store confidence for potential future use
-                if not hasattr(paragraph, 'speaker_confidence'):
+                if paragraph.speaker_confidence is None:
                     paragraph.speaker_confidence = result['speaker_confidence']
             
             # Update UI
             self._update_paragraph_display()
             
             # Count speakers
-            client_count = sum(1 for p in self.app_state.paragraphs if p.speaker == 'client')
-            therapist_count = sum(1 for p in self.app_state.paragraphs if p.speaker == 'therapist')
-            unknown_count = sum(1 for p in self.app_state.paragraphs if p.speaker == 'unknown')
+            counts = self.app_state.get_speaker_distribution()
             
             ui.notify(
                 f'✅ Speaker identification complete! '
-                f'Client: {client_count}, Therapist: {therapist_count}, Unknown: {unknown_count}', 
+                f'Client: {counts["client"]}, Therapist: {counts["therapist"]}, Unknown: {counts["unknown"]}', 
                 type='positive'
             )
             
@@ -111,24 +109,25 @@ class SpeakersSection:
             ui.notify('No transcript available', type='warning')
             return
         
-        # Count therapist paragraphs before removal
-        therapist_count = sum(1 for p in self.app_state.paragraphs if p.speaker == 'therapist')
+        # Split off therapist paragraphs in a single pass
+        original_count = len(self.app_state.paragraphs)
+        kept_paragraphs = [p for p in self.app_state.paragraphs if p.speaker != 'therapist']
+        therapist_count = original_count - len(kept_paragraphs)
         
         if therapist_count == 0:
             ui.notify('No therapist paragraphs found to remove', type='info')
             return
         
-        # Filter out therapist paragraphs
-        original_count = len(self.app_state.paragraphs)
-        self.app_state.paragraphs = [p for p in self.app_state.paragraphs if p.speaker != 'therapist']
-        
-        # Reassign paragraph IDs
-        for i, paragraph in enumerate(self.app_state.paragraphs):
+        # Reassign paragraph IDs (before handing the list over, so AppState indexes the new ids)
+        for i, paragraph in enumerate(kept_paragraphs):
             paragraph.id = i
+            for entity in paragraph.entities:
+                entity.paragraph_id = i
+        
+        self.app_state.paragraphs = kept_paragraphs
         
         # Update current transcript
-        remaining_texts = [p.text for p in self.app_state.paragraphs]
-        self.app_state.current_transcript = '\n\n'.join(remaining_texts)
+        self.app_state.rebuild_transcript()
         
         # Update UI
         self._update_paragraph_display()
@@ -168,7 +167,7 @@ class SpeakersSection:
                         speaker_badge.on('click', lambda p=paragraph: self._toggle_speaker(p))
                         
                         # Show confidence if available
-                        if hasattr(paragraph, 'speaker_confidence'):
+                        if paragraph.speaker_confidence is not None:
                             confidence_pct = int(paragraph.speaker_confidence * 100)
                             ui.label(f'({confidence_pct}%)').classes('text-caption text-grey-5')
                     
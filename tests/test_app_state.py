@@ -0,0 +1,143 @@
+"""
+Pytest cases for AppState transcript loading
+
+Run from the repository root:
+    python -m pytest -q tests/test_app_state.py
+"""
+
+import io
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add the repository root to path so the src package and its relative imports resolve
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src import app_state as app_state_module
+from src.app_state import AppState, CodingScheme, Entity
+
+
+_TRANSCRIPTS = (
+    '',
+    'Single paragraph without a break.',
+    'First paragraph.\n\nSecond paragraph.\n\nThird paragraph.',
+    'Line one\nline two of the same paragraph.\n\nNext one.',
+    'Windows line endings.\r\n\r\nSecond paragraph.\r\n',
+    '\n\n  Leading blank lines.\n\n\n\n\nMany blank lines.  \n \t \nWhitespace-only separator.\n\n',
+    'Therapist: How are you?\n\nClient: Ça va, merci. Très bien — vraiment 😊.\n\n' * 5,
+    'First sentence here. Second sentence here. Third one.\n\n',
+    'First line\nsecond line\nthird line',
+    'No line breaks. Only sentences! Three of them?',
+)
+
+
+def _paragraph_texts(state):
+    return [p.text for p in state.paragraphs]
+
+
+@pytest.mark.parametrize('chunk_size', [1, 3, 7, 64, 64 * 1024])
+@pytest.mark.parametrize('text', _TRANSCRIPTS)
+def test_stream_loading_matches_in_memory_split(text, chunk_size, monkeypatch):
+    """Streaming the file in chunks finds the same paragraphs as splitting the whole text"""
+    expected = AppState()
+    expected.load_transcript(text)
+    
+    monkeypatch.setattr(app_state_module, '_READ_CHUNK_SIZE', chunk_size)
+    streamed = AppState()
+    streamed.load_transcript_from_stream(io.BytesIO(text.encode('utf-8')), 'transcript.txt')
+    
+    assert streamed.current_transcript == text
+    assert streamed.original_transcript == text
+    assert streamed.transcript_file_path == 'transcript.txt'
+    assert _paragraph_texts(streamed) == _paragraph_texts(expected)
+    assert [p.id for p in streamed.paragraphs] == list(range(len(streamed.paragraphs)))
+
+
+@pytest.mark.parametrize('text, expected', [
+    # One blank-line terminated block stays whole, as before the fallbacks were reworked
+    ('First sentence here. Second sentence here. Third one.\n\n',
+     ['First sentence here. Second sentence here. Third one.']),
+    ('\n\nOne block. Two sentences.', ['One block. Two sentences.']),
+    # Without a blank line, single line breaks and then sentences are used instead
+    ('First line\nsecond line', ['First line', 'second line']),
+    ('No line breaks. Only sentences! Three of them?', ['No line breaks', 'Only sentences', 'Three of them']),
+])
+def test_fallback_splits_only_without_blank_lines(text, expected):
+    state = AppState()
+    state.load_transcript(text)
+    assert _paragraph_texts(state) == expected
+
+
+def test_stream_loading_multibyte_character_across_chunks(monkeypatch):
+    """A UTF-8 sequence split between two reads is decoded once, not replaced or dropped"""
+    monkeypatch.setattr(app_state_module, '_READ_CHUNK_SIZE', 4)
+    text = 'abc😊def\n\nérable'
+    state = AppState()
+    state.load_transcript_from_stream(io.BytesIO(text.encode('utf-8')))
+    
+    assert _paragraph_texts(state) == ['abc😊def', 'érable']
+
+
+def test_stream_loading_rejects_invalid_utf8():
+    state = AppState()
+    with pytest.raises(UnicodeDecodeError):
+        state.load_transcript_from_stream(io.BytesIO(b'valid\n\n\xff\xfe invalid'))
+
+
+def _sample_state(edited: bool) -> AppState:
+    state = AppState()
+    state.load_transcript('Therapist: Hello Anna.\n\nClient: Ça va, merci 😊.\n\nTherapist: Good.', 'session.txt')
+    state.current_step = 2
+    state.update_paragraph_speaker(0, 'therapist')
+    state.update_paragraph_sentiment(1, 'positive')
+    state.paragraphs[1].speaker_confidence = 0.75
+    state.add_paragraph_code(0, 'GREET')
+    state.add_paragraph_code(0, 'A1')
+    state.add_entity(Entity('Anna', 'PERSON', 17, 21, anonymized=True, replacement='[PERSON]', paragraph_id=0))
+    state.add_entity(Entity('Good', 'MISC', 11, 15, paragraph_id=2, auto_detected=False))
+    state.add_coding_scheme(CodingScheme('GREET', 'Greeting', ['hello', 'hi', 'good morning', 'welcome']))
+    state.add_coding_scheme(CodingScheme('A1', 'Affect', []))
+    state.analysis_results = {'summary': {'paragraphs': 3}, 'codes': ['A1', 'GREET']}
+    if edited:
+        state.current_transcript += '\n\nAppended note.'
+    return state
+
+
+@pytest.mark.parametrize('edited', [False, True])
+@pytest.mark.parametrize('save_with_orjson, load_with_orjson', [
+    (True, True),
+    (True, False),
+    (False, True),
+    (False, False),
+])
+def test_save_load_round_trip(tmp_path, monkeypatch, edited, save_with_orjson, load_with_orjson):
+    """State survives save_to_file/load_from_file, and files are interchangeable between the orjson and json paths"""
+    if (save_with_orjson or load_with_orjson) and not app_state_module.ORJSON_AVAILABLE:
+        pytest.skip('orjson is not installed')
+    original = _sample_state(edited)
+    file_path = tmp_path / 'state.json'
+    
+    monkeypatch.setattr(app_state_module, 'ORJSON_AVAILABLE', save_with_orjson)
+    original.save_to_file(str(file_path))
+    
+    monkeypatch.setattr(app_state_module, 'ORJSON_AVAILABLE', load_with_orjson)
+    loaded = AppState()
+    loaded.load_from_file(str(file_path))
+    
+    assert loaded.export_state() == original.export_state()
+    assert loaded.original_transcript == original.original_transcript
+    assert loaded.paragraphs == original.paragraphs
+    assert loaded.coding_schemes == original.coding_schemes
+    assert loaded.paragraphs_for_code('GREET') == [loaded.paragraphs[0]]
+
+
+def test_saved_state_is_indented_json(tmp_path):
+    state = _sample_state(edited=False)
+    file_path = tmp_path / 'state.json'
+    state.save_to_file(str(file_path))
+    
+    text = file_path.read_text(encoding='utf-8')
+    assert text.startswith('{\n  "current_step": 2,')
+    assert 'Ça va, merci 😊.' in text
+    assert '"codes": [\n        "A1",\n        "GREET"\n      ]' in text
@@ -0,0 +1,120 @@
+"""
+Pytest cases for the keyword heuristics behind NLPService
+(sentiment, speaker identification and text statistics)
+
+Run from the repository root:
+    python -m pytest -q tests/test_nlp_heuristics.py
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add the repository root to path so the src package and its relative imports resolve
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.services import nlp_service
+from src.services.nlp_service import _analyze_sentiment, _identify_speaker, _text_statistics
+
+
+@pytest.mark.parametrize('text', [
+    'Goodness gracious, what a day.',
+    'I was unhappy with the result.',
+    'We played badminton after lunch.',
+    'That was a lovely surprise.',
+])
+def test_sentiment_words_only_match_whole_words(text):
+    """Sentiment words embedded in longer words are not counted"""
+    assert _analyze_sentiment(text) == 'neutral'
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('It was GOOD to see you.', 'positive'),
+    ('Good.', 'positive'),
+    ('That was terrible!', 'negative'),
+    ('Good days and bad days.', 'mixed'),
+    ('We talked about the weather.', 'neutral'),
+])
+def test_sentiment_labels(text, expected):
+    assert _analyze_sentiment(text) == expected
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('Tell me more about your week.', 'therapist'),
+    ('I feel tired all the time.', 'client'),
+    ('I feel that sounds right, what do you think?', 'therapist'),
+    ('Nothing to add.', 'unknown'),
+])
+def test_speaker_labels(text, expected):
+    assert _identify_speaker(text) == expected
+
+
+@pytest.mark.parametrize('text', [
+    'Hi feel free to sit down.',
+    'I feeling is not a sentence.',
+    'We both think it is fine.',
+])
+def test_speaker_indicators_only_match_whole_phrases(text):
+    """Indicator phrases that start or end inside a longer word are not counted"""
+    assert _identify_speaker(text) == 'unknown'
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('Good, good, but a bit bad.', 'positive'),
+    ('Bad, awful, terrible, but one great moment.', 'negative'),
+    ('Good and bad, good and bad.', 'mixed'),
+])
+def test_sentiment_counts_every_occurrence(text, expected):
+    """Repeated sentiment words each count, instead of only whether a word is present"""
+    assert _analyze_sentiment(text) == expected
+
+
+def test_speaker_counts_distinct_indicators():
+    """A repeated indicator counts once, so two different therapist phrases outweigh one repeated client phrase"""
+    text = 'I feel, I feel, I feel. That sounds hard, what do you think?'
+    assert _identify_speaker(text) == 'therapist'
+
+
+_SPEAKER_SAMPLES = (
+    'Tell me more about your week.',
+    'I feel tired all the time.',
+    'I feel, I feel, I feel. That sounds hard, what do you think?',
+    "I don't know, it's hard. I understand.",
+    'Hi feel free to sit down.',
+    'Nothing to add.',
+)
+
+
+@pytest.mark.skipif(nlp_service._SPEAKER_AUTOMATON is None, reason='pyahocorasick is not installed')
+@pytest.mark.parametrize('text', _SPEAKER_SAMPLES)
+def test_speaker_automaton_matches_regex_fallback(text, monkeypatch):
+    """The Aho-Corasick scan and the regex fallback label every sample the same way"""
+    # __wrapped__ bypasses the lru_cache, so both runs really compute the label
+    with_automaton = _identify_speaker.__wrapped__(text)
+    monkeypatch.setattr(nlp_service, '_SPEAKER_AUTOMATON', None)
+    assert _identify_speaker.__wrapped__(text) == with_automaton
+
+
+def test_text_statistics_counts():
+    stats = _text_statistics('One two. Three four!\n\nFive six seven?')
+    assert stats['characters'] == 37
+    assert stats['words'] == 7
+    assert stats['sentences'] == 3
+    assert stats['paragraphs'] == 2
+
+
+def test_text_statistics_average_over_non_empty_sentences():
+    """Trailing punctuation and blank paragraphs do not add empty segments to the averages"""
+    stats = _text_statistics('One two three. Four five six...\n\n\n\n')
+    assert stats['sentences'] == 2
+    assert stats['paragraphs'] == 1
+    assert stats['avg_words_per_sentence'] == 3
+    assert stats['avg_sentences_per_paragraph'] == 2
+
+
+def test_text_statistics_empty_text():
+    stats = _text_statistics('')
+    assert stats['sentences'] == 0
+    assert stats['avg_words_per_sentence'] == 0
+    assert stats['avg_sentences_per_paragraph'] == 0
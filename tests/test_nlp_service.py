@@ -0,0 +1,91 @@
+"""
+Pytest cases for the shared Stanza pipeline loading in NLPService,
+using a slow stand-in for the stanza module
+
+Run from the repository root:
+    python -m pytest -q tests/test_nlp_service.py
+"""
+
+import sys
+import threading
+import types
+from pathlib import Path
+
+import pytest
+
+# Add the repository root to path so the src package and its relative imports resolve
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.services import nlp_service
+from src.services.nlp_service import NLPService, NLP_READY
+
+
+class _SlowPipeline:
+    """Stand-in for stanza.Pipeline that tags 'Anna' as a person once the test releases it"""
+    
+    def __init__(self, gate: threading.Event):
+        gate.wait(5)
+    
+    def __call__(self, text):
+        ents = [types.SimpleNamespace(text='Anna', type='PER', start_char=0, end_char=4)] if 'Anna' in text else []
+        return types.SimpleNamespace(sentences=[types.SimpleNamespace(ents=ents)])
+
+
+@pytest.fixture
+def fake_stanza(monkeypatch):
+    """Fresh NLPService loading state and a fake stanza module whose Pipeline blocks on a gate"""
+    gate = threading.Event()
+    downloads = []
+    module = types.ModuleType('stanza')
+    module.Pipeline = lambda *args, **kwargs: _SlowPipeline(gate)
+    module.download = lambda *args, **kwargs: downloads.append(args)
+    monkeypatch.setitem(sys.modules, 'stanza', module)
+    
+    monkeypatch.setattr(NLPService, '_shared_pipeline', None)
+    monkeypatch.setattr(NLPService, '_shared_initialized', False)
+    monkeypatch.setattr(NLPService, '_init_thread', None)
+    was_ready = NLP_READY.is_set()
+    NLP_READY.clear()
+    yield types.SimpleNamespace(gate=gate, downloads=downloads)
+    
+    gate.set()
+    if NLPService._init_thread is not None:
+        NLPService._init_thread.join(5)
+    if was_ready:
+        NLP_READY.set()
+    else:
+        NLP_READY.clear()
+
+
+def test_service_created_mid_load_uses_the_loaded_pipeline(fake_stanza, monkeypatch):
+    """A service built while the pipeline is loading waits for it instead of staying on the regex fallback"""
+    monkeypatch.setattr(nlp_service, 'stanza_models_available', lambda lang='en': True)
+    early = NLPService()
+    late = NLPService()
+    assert late.nlp_pipeline is None
+    
+    results = []
+    caller = threading.Thread(target=lambda: results.append(late.extract_entities('Anna came in today.')))
+    caller.start()
+    fake_stanza.gate.set()
+    caller.join(5)
+    
+    assert NLP_READY.is_set()
+    assert late.nlp_pipeline is NLPService._shared_pipeline is early.nlp_pipeline
+    assert [(e.text, e.entity_type) for e in results[0]] == [('Anna', 'PERSON')]
+
+
+def test_models_are_downloaded_once(fake_stanza, monkeypatch):
+    """On a first run only one loader downloads the models, however many callers need them"""
+    monkeypatch.setattr(nlp_service, 'stanza_models_available', lambda lang='en': False)
+    services = [NLPService() for _ in range(3)]
+    callers = [threading.Thread(target=service.extract_entities_batch, args=(['Anna said hello.'],))
+               for service in services]
+    for caller in callers:
+        caller.start()
+    fake_stanza.gate.set()
+    for caller in callers:
+        caller.join(5)
+    
+    assert len(fake_stanza.downloads) == 1
+    assert all(service.nlp_pipeline is not None for service in services)